@@ -1,17 +1,22 @@
 from __future__ import annotations
 
+import json
 import logging
-from datetime import datetime
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
 from zoneinfo import ZoneInfo
 
 import pandas as pd
 
 from data.fetcher import NBADataFetcher
-from database.csv_store import CSVDatabase
-from model.rating_model import TeamProfile, TeamStrengthModel
+from database.backend import get_database
+from model.performance import build_rollup, merge_rollup, rebuild_rollup, settle_predictions
+from model.rating_model import TeamStrengthModel, TeamTable
 from simulation.monte_carlo import NBAMonteCarloSimulator
 
 BJ_TZ = ZoneInfo("Asia/Shanghai")
+BACKFILL_CHECKPOINT = Path("database/storage/backfill_checkpoint.json")
 LOGGER = logging.getLogger(__name__)
 
 
@@ -42,34 +47,37 @@ def total_pick_or_no_bet(prob_over: float, threshold: float = 0.53) -> str:
     return "No Bet"
 
 
-def run_prediction_job() -> pd.DataFrame:
+def run_prediction_job(n_runs: int = 10000, workers: int | None = None) -> pd.DataFrame:
+    """生成次日预测。
+
+    指定 ``workers`` 时按比赛独立随机数流在多进程间模拟，结果与进程数、赛程顺序无关。
+    """
     now = datetime.now(BJ_TZ)
     fetcher = NBADataFetcher()
-    store = CSVDatabase()
-    model = TeamStrengthModel()
-    sim = NBAMonteCarloSimulator(n_runs=10000)
+    store = get_database()
+    sim = NBAMonteCarloSimulator(n_runs=n_runs)
 
     tomorrow_games = fetcher.fetch_tomorrow_games_with_odds(now)
     if tomorrow_games.empty:
         LOGGER.info("明日无比赛或数据获取失败")
         return tomorrow_games
 
-    state_df = store.load_model_state()
-    profiles = {
-        row["team"]: TeamProfile(
-            team=row["team"],
-            offense_rating=float(row["offense_rating"]),
-            defense_rating=float(row["defense_rating"]),
-            pace=float(row["pace"]),
+    table = TeamTable.from_state(store.load_model_state())
+    home_mu, away_mu = sim.table_expected_scores(
+        table, table.indices(tomorrow_games["home_team"]), table.indices(tomorrow_games["away_team"])
+    )
+    spread_lines = tomorrow_games["spread_line"].to_numpy(dtype=float)
+    total_lines = tomorrow_games["total_line"].to_numpy(dtype=float)
+    if workers is None:
+        slate = sim.simulate_expected(home_mu, away_mu, spread_lines, total_lines)
+    else:
+        slate = sim.simulate_expected_seeded(
+            tomorrow_games["game_id"].astype(str).tolist(), home_mu, away_mu, spread_lines, total_lines, workers=workers
         )
-        for _, row in state_df.iterrows()
-    }
 
     rows = []
-    for _, game in tomorrow_games.iterrows():
-        home = profiles.get(game["home_team"], model.default_profile(game["home_team"]))
-        away = profiles.get(game["away_team"], model.default_profile(game["away_team"]))
-        result = sim.simulate_game(home, away, float(game["spread_line"]), float(game["total_line"]))
+    for i, (_, game) in enumerate(tomorrow_games.iterrows()):
+        result = slate.game(i)
 
         spread_pick = pick_or_no_bet(game["home_team"], game["away_team"], result.spread_cover_prob)
         total_pick = total_pick_or_no_bet(result.over_prob)
@@ -99,11 +107,34 @@ def run_prediction_job() -> pd.DataFrame:
     return out_df
 
 
+def update_performance_rollup(store, new_results: pd.DataFrame) -> pd.DataFrame:
+    """只结算本次新入库赛果对应的预测并叠加到表现汇总表；汇总表为空时全量构建一次。"""
+    rollup = store.load_rollup()
+    if rollup.empty:
+        return rebuild_rollup(store)
+    if new_results.empty:
+        return rollup
+
+    scores = new_results[["game_id", "home_score", "away_score", "total_score"]].copy()
+    scores["game_id"] = scores["game_id"].astype(str)
+    preds = store.load_predictions_for_games(scores["game_id"].tolist())
+    if preds.empty:
+        return rollup
+    preds["game_id"] = preds["game_id"].astype(str)
+    settled = preds.merge(scores, on="game_id", how="inner")
+
+    if settled.empty:
+        return rollup
+    rollup = merge_rollup(rollup, build_rollup(settle_predictions(settled)))
+    store.save_rollup(rollup)
+    return rollup
+
+
 def run_review_and_retrain_job() -> pd.DataFrame:
     now = datetime.now(BJ_TZ)
     fetcher = NBADataFetcher()
-    store = CSVDatabase()
-    model = TeamStrengthModel()
+    store = get_database()
+    model = rating_model()
 
     results_df = fetcher.fetch_yesterday_results(now)
     if results_df.empty:
@@ -111,22 +142,109 @@ def run_review_and_retrain_job() -> pd.DataFrame:
         return results_df
 
     results_df.insert(0, "sync_date_bj", now.strftime("%Y-%m-%d %H:%M"))
-    store.save_results(results_df)
-
-    all_results = store.load_results()
-    profiles = model.fit(all_results)
-    state_rows = [
-        {
-            "updated_at_bj": now.strftime("%Y-%m-%d %H:%M"),
-            "team": p.team,
-            "offense_rating": p.offense_rating,
-            "defense_rating": p.defense_rating,
-            "pace": p.pace,
-        }
-        for p in profiles.values()
-    ]
-
-    if state_rows:
-        store.save_model_state(pd.DataFrame(state_rows))
+    new_results = store.save_results(results_df)
+    update_performance_rollup(store, new_results)
 
+    state_df = store.load_model_state()
+    if model.supports_state(state_df):
+        acc = model.update_state(state_df, new_results)
+        # ridge 评分依赖全部比赛，以前一版状态热启动求解；场均方式只需累计量
+        all_results = store.load_results() if model.method == "ridge" else None
+        store.save_model_state(model.ratings_state(acc, all_results, state_df, now.strftime("%Y-%m-%d %H:%M")))
+        LOGGER.info("增量重校准完成，叠加新赛果 %d 场", len(new_results))
+    else:
+        LOGGER.info("模型状态缺少累计量或衰减设置已变更，执行全量重拟合")
+        refit_model_state(store, model, now)
     return results_df
+
+
+def rating_model() -> TeamStrengthModel:
+    """按环境变量构建球队强度模型。
+
+    ``MODEL_HALF_LIFE_DAYS`` 为时间衰减半衰期（未设置则不衰减），``MODEL_FIT_METHOD`` 为
+    ``means``（默认）或 ``ridge``，``RIDGE_ALPHA`` 为 ridge 正则强度。
+    """
+    half_life = os.getenv("MODEL_HALF_LIFE_DAYS", "").strip()
+    return TeamStrengthModel(
+        half_life_days=float(half_life) if half_life else None,
+        method=os.getenv("MODEL_FIT_METHOD", "means").strip().lower() or "means",
+        ridge_alpha=float(os.getenv("RIDGE_ALPHA", "10") or 10),
+    )
+
+
+def refit_model_state(store, model: TeamStrengthModel, now: datetime) -> pd.DataFrame:
+    """用全部历史赛果重新拟合球队强度并写入模型状态，返回新的模型状态表。"""
+    results = store.load_results()
+    state_df = model.ratings_state(
+        model.fit_state(results), results, store.load_model_state(), now.strftime("%Y-%m-%d %H:%M")
+    )
+    if not state_df.empty:
+        store.save_model_state(state_df)
+    return state_df
+
+
+def _load_checkpoint(path: Path) -> set[str]:
+    if not path.exists():
+        return set()
+    with path.open(encoding="utf-8") as fh:
+        return set(json.load(fh).get("done", []))
+
+
+def _write_checkpoint(path: Path, done: set[str]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as fh:
+        json.dump({"done": sorted(done)}, fh)
+    os.replace(tmp, path)
+
+
+def run_backfill_job(
+    start: date,
+    end: date,
+    chunk_days: int = 30,
+    checkpoint_path: Path = BACKFILL_CHECKPOINT,
+) -> pd.DataFrame:
+    """回填 [start, end] 区间内的历史赛果，完成后只重新拟合一次模型。
+
+    每批 ``chunk_days`` 天并发抓取、整批入库，入库后才把该批成功的日期记入检查点；
+    中断后重新运行会跳过检查点中的日期，抓取失败的日期留待下次重试。
+    """
+    if end < start:
+        raise ValueError(f"回填结束日期 {end} 早于开始日期 {start}")
+
+    now = datetime.now(BJ_TZ)
+    fetcher = NBADataFetcher()
+    store = get_database()
+    model = rating_model()
+
+    done = _load_checkpoint(checkpoint_path)
+    pending = [
+        day
+        for day in (start + timedelta(days=i) for i in range((end - start).days + 1))
+        if day.isoformat() not in done
+    ]
+    LOGGER.info("回填 %s ~ %s：待抓取 %d 天，检查点已完成 %d 天", start, end, len(pending), len(done))
+
+    saved = []
+    failed = 0
+    for offset in range(0, len(pending), chunk_days):
+        chunk = pending[offset : offset + chunk_days]
+        results_df, fetched_days = fetcher.fetch_results_by_dates(chunk)
+        failed += len(chunk) - len(fetched_days)
+        if not results_df.empty:
+            results_df.insert(0, "sync_date_bj", now.strftime("%Y-%m-%d %H:%M"))
+            saved.append(store.save_results(results_df))
+
+        done.update(day.isoformat() for day in fetched_days)
+        _write_checkpoint(checkpoint_path, done)
+        LOGGER.info("回填进度 %d/%d 天，本批赛果 %d 场", offset + len(chunk), len(pending), len(results_df))
+
+    if failed:
+        LOGGER.warning("%d 个日期抓取失败，重新运行将只重试这些日期", failed)
+
+    new_results = pd.concat(saved, ignore_index=True) if saved else pd.DataFrame()
+    if not new_results.empty:
+        update_performance_rollup(store, new_results)
+    state_df = refit_model_state(store, model, now)
+    LOGGER.info("回填新增赛果 %d 场，已重新拟合 %d 支球队", len(new_results), len(state_df))
+    return new_results
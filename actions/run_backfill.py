@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import argparse
+import logging
+from datetime import date
+from pathlib import Path
+
+from actions.pipeline import BACKFILL_CHECKPOINT, run_backfill_job
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="历史赛果回填（可断点续跑）")
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="开始日期 YYYY-MM-DD")
+    parser.add_argument("--end", type=date.fromisoformat, required=True, help="结束日期 YYYY-MM-DD（含）")
+    parser.add_argument("--chunk-days", type=int, default=30, help="每批并发抓取并入库的天数")
+    parser.add_argument("--checkpoint", type=Path, default=BACKFILL_CHECKPOINT, help="检查点文件路径")
+    args = parser.parse_args()
+    run_backfill_job(args.start, args.end, chunk_days=args.chunk_days, checkpoint_path=args.checkpoint)
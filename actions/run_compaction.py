@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+import logging
+
+from database.backend import get_database
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+if __name__ == "__main__":
+    removed = get_database().compact()
+    logging.info("存储压实完成，删除重复行: %s", removed)
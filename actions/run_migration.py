@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import argparse
+import logging
+
+from database.backend import BACKENDS, get_database
+from model.performance import rebuild_rollup
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+
+def migrate(source: str, target: str) -> dict[str, int]:
+    """将预测、赛果与模型状态从一个存储后端一次性复制到另一个后端，并在目标后端重建表现汇总表。"""
+    src = get_database(source)
+    dst = get_database(target)
+    counts = {
+        "predictions": len(dst.save_predictions(src.load_predictions())),
+        "results": len(dst.save_results(src.load_results())),
+    }
+    state = src.load_model_state()
+    if not state.empty:
+        dst.save_model_state(state)
+    counts["model_state"] = len(state)
+    counts["rollup"] = len(rebuild_rollup(dst))
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="存储后端迁移")
+    parser.add_argument("--source", choices=BACKENDS, default="csv")
+    parser.add_argument("--target", choices=BACKENDS, default="parquet")
+    args = parser.parse_args()
+    logging.info("迁移完成: %s", migrate(args.source, args.target))
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import logging
+import os
 
 from actions.pipeline import run_prediction_job
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
 if __name__ == "__main__":
-    df = run_prediction_job()
+    workers = os.getenv("MC_WORKERS")
+    df = run_prediction_job(
+        n_runs=int(os.getenv("MC_RUNS", "10000")),
+        workers=int(workers) if workers else None,
+    )
     logging.info("预测任务完成，场次: %s", len(df))
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+
+from actions.pipeline import BJ_TZ, rating_model, refit_model_state
+from database.backend import get_database
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+RATING_COLUMNS = ["offense_rating", "defense_rating", "pace"]
+
+
+def refit_and_compare() -> float:
+    """全量重拟合模型状态，并返回与原（增量维护的）状态评分的最大绝对差。"""
+    store = get_database()
+    previous = store.load_model_state()
+    refreshed = refit_model_state(store, rating_model(), datetime.now(BJ_TZ))
+    if previous.empty or refreshed.empty:
+        return 0.0
+
+    joined = refreshed.merge(previous, on="team", how="outer", suffixes=("", "_prev"))
+    missing = joined[RATING_COLUMNS + [f"{c}_prev" for c in RATING_COLUMNS]].isna().any(axis=1)
+    if missing.any():
+        logging.warning("球队集合不一致: %s", sorted(joined.loc[missing, "team"]))
+    diffs = [(joined[c] - joined[f"{c}_prev"]).abs().max() for c in RATING_COLUMNS]
+    return float(max(d for d in diffs if d == d) if any(d == d for d in diffs) else 0.0)
+
+
+if __name__ == "__main__":
+    drift = refit_and_compare()
+    logging.info("全量重拟合完成，与增量状态的最大评分差: %.6g", drift)
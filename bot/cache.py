@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class VersionedCache:
+    """按存储版本失效的 LRU 缓存，用于机器人共享已解析的数据表与渲染好的回复。
+
+    键为 ``(名称, 存储版本)``：版本变化后旧条目不再命中，并随 LRU 淘汰。
+    """
+
+    def __init__(self, max_entries: int = 32) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[Hashable, Hashable], Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, name: Hashable, version: Hashable, build: Callable[[], Any]) -> Any:
+        key = (name, version)
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self.misses += 1
+        value = build()
+        self._entries[key] = value
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -2,25 +2,46 @@ from __future__ import annotations
 
 import logging
 import os
+from typing import TYPE_CHECKING
 
 import pandas as pd
 from telegram import ReplyKeyboardMarkup, Update
 from telegram.ext import ApplicationBuilder, CommandHandler, ContextTypes, MessageHandler, filters
 
-from database.csv_store import CSVDatabase
+from bot.cache import VersionedCache
+from database.backend import get_database
+from model.performance import load_or_build_rollup
+
+if TYPE_CHECKING:
+    from database.csv_store import CSVDatabase
+    from database.parquet_store import ParquetDatabase
+    from database.sqlite_store import SQLiteDatabase
+
+    Database = CSVDatabase | SQLiteDatabase | ParquetDatabase
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
 BUTTONS = [["📊 今日预测", "📈 模型表现"], ["🧪 模型测试", "📅 今日赛程"], ["⚙️ 模型状态"]]
 KEYBOARD = ReplyKeyboardMarkup(BUTTONS, resize_keyboard=True)
 
+CACHE = VersionedCache(max_entries=int(os.getenv("BOT_CACHE_ENTRIES", "32")))
+_STORE: Database | None = None
+
+
+def _get_store() -> Database:
+    """进程内共享一个存储实例，避免每条消息重复建目录、检查文件。"""
+    global _STORE
+    if _STORE is None:
+        _STORE = get_database()
+    return _STORE
 
-def _latest_predictions(store: CSVDatabase) -> pd.DataFrame:
-    df = store.load_predictions()
-    if df.empty:
-        return df
-    latest_run = df["run_date_bj"].max()
-    return df[df["run_date_bj"] == latest_run].copy()
+
+def _latest_predictions(store: Database) -> pd.DataFrame:
+    return CACHE.get_or_build("latest_predictions", store.version(), store.load_latest_predictions)
+
+
+def _cached_reply(name: str, store: Database, render) -> str:
+    return CACHE.get_or_build(("reply", name), store.version(), render)
 
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -29,18 +50,20 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
 async def handle_buttons(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     text = update.message.text
-    store = CSVDatabase()
+    store = _get_store()
 
     if text == "📊 今日预测":
-        await update.message.reply_text(render_predictions(_latest_predictions(store)))
+        reply = _cached_reply(text, store, lambda: render_predictions(_latest_predictions(store)))
+        await update.message.reply_text(reply)
     elif text == "📈 模型表现":
-        await update.message.reply_text(render_performance(store))
+        await update.message.reply_text(_cached_reply(text, store, lambda: render_performance(store)))
     elif text == "🧪 模型测试":
         await update.message.reply_text("模型测试：Monte Carlo=10000次，阈值=53%，支持长期回测。")
     elif text == "📅 今日赛程":
-        await update.message.reply_text(render_schedule(_latest_predictions(store)))
+        reply = _cached_reply(text, store, lambda: render_schedule(_latest_predictions(store)))
+        await update.message.reply_text(reply)
     elif text == "⚙️ 模型状态":
-        await update.message.reply_text(render_status(store))
+        await update.message.reply_text(_cached_reply(text, store, lambda: render_status(store)))
     else:
         await update.message.reply_text("请使用下方按钮进行操作。", reply_markup=KEYBOARD)
 
@@ -72,51 +95,26 @@ def render_schedule(df: pd.DataFrame) -> str:
     return "\n".join(lines)
 
 
-def render_performance(store: CSVDatabase) -> str:
-    pred = store.load_predictions()
-    results = store.load_results()
-    if pred.empty or results.empty:
-        return "模型表现：数据不足，尚未形成回测样本。"
-
-    merged = pred.merge(results[["game_id", "home_score", "away_score", "total_score"]], on="game_id", how="inner")
-    if merged.empty:
+def render_performance(store: Database) -> str:
+    rollup = load_or_build_rollup(store)
+    if rollup.empty:
         return "模型表现：暂无可匹配样本。"
 
-    spread_hit = 0
-    total_hit = 0
-    total_bet = 0
-    for _, row in merged.iterrows():
-        margin = row["home_score"] - row["away_score"]
-        spread_pick = row["spread_pick"]
-        if spread_pick != "No Bet":
-            total_bet += 1
-            if (spread_pick.endswith("让分") and margin > row["spread_line"]) or (
-                spread_pick.endswith("受让") and margin < row["spread_line"]
-            ):
-                spread_hit += 1
-
-        total_pick = row["total_pick"]
-        if total_pick != "No Bet":
-            total_bet += 1
-            if (total_pick == "大分" and row["total_score"] > row["total_line"]) or (
-                total_pick == "小分" and row["total_score"] < row["total_line"]
-            ):
-                total_hit += 1
-
-    hit = spread_hit + total_hit
+    samples = int(rollup.loc[rollup["market"] == "spread", "settled"].sum())
+    total_bet = int(rollup["bets"].sum())
+    hit = int(rollup["hits"].sum())
     hit_rate = 0 if total_bet == 0 else hit / total_bet * 100
-    return f"📈 模型表现\n样本数: {len(merged)}\n总下注项: {total_bet}\n命中率: {hit_rate:.2f}%"
+    return f"📈 模型表现\n样本数: {samples}\n总下注项: {total_bet}\n命中率: {hit_rate:.2f}%"
 
 
-def render_status(store: CSVDatabase) -> str:
+def render_status(store: Database) -> str:
     state = store.load_model_state()
-    pred = store.load_predictions()
     return (
         "⚙️ 模型状态\n"
         f"球队参数数量: {len(state)}\n"
-        f"预测记录数: {len(pred)}\n"
+        f"预测记录数: {store.count_predictions()}\n"
         "Monte Carlo次数: 10000\n"
-        "数据库: CSV"
+        f"数据库: {store.backend_name}"
     )
 
 
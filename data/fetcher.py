@@ -1,16 +1,21 @@
 from __future__ import annotations
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta
 from typing import Any
 
 import pandas as pd
-import requests
 from zoneinfo import ZoneInfo
 
+from data.http_client import FetchError, HTTPClient
+from nba_quant_model.src.response_cache import CacheMiss, ResponseCache
+from nba_quant_model.src.time_utils import convert_utc_series_to_beijing
+
 LOGGER = logging.getLogger(__name__)
 BJ_TZ = ZoneInfo("Asia/Shanghai")
+SCHEDULE_TTL_SECONDS = 600
 
 
 @dataclass
@@ -27,9 +32,17 @@ class GameInfo:
 class NBADataFetcher:
     """负责获取NBA赛程、盘口和赛果。"""
 
-    def __init__(self, timeout: int = 15) -> None:
+    def __init__(
+        self,
+        timeout: int = 15,
+        base_url: str = "https://www.balldontlie.io/api/v1",
+        client: HTTPClient | None = None,
+        max_workers: int = 8,
+    ) -> None:
         self.timeout = timeout
-        self.base_url = "https://www.balldontlie.io/api/v1"
+        self.base_url = base_url
+        self.client = client or HTTPClient(timeout=timeout, cache=ResponseCache())
+        self.max_workers = max_workers
 
     def fetch_tomorrow_games_with_odds(self, beijing_now: datetime | None = None) -> pd.DataFrame:
         now = beijing_now or datetime.now(BJ_TZ)
@@ -39,11 +52,10 @@ class NBADataFetcher:
         if not games:
             return pd.DataFrame(columns=list(GameInfo.__annotations__.keys()))
 
+        utc_times = pd.Series([g["date"] for g in games])
         records: list[dict[str, Any]] = []
-        for g in games:
+        for g, utc_time, bj_time in zip(games, utc_times, self._utc_to_beijing(utc_times)):
             game_id = str(g["id"])
-            utc_time = g["date"]
-            bj_time = self._utc_to_beijing(utc_time)
             home = g["home_team"]["full_name"]
             away = g["visitor_team"]["full_name"]
 
@@ -66,7 +78,16 @@ class NBADataFetcher:
         now = beijing_now or datetime.now(BJ_TZ)
         target_day = (now - timedelta(days=1)).date()
 
-        games = self._fetch_games_by_date(target_day)
+        return self._results_frame(self._fetch_games_by_date(target_day))
+
+    def fetch_results_by_dates(self, days: list[date]) -> tuple[pd.DataFrame, list[date]]:
+        """并发抓取多个日期的完赛结果，返回 (赛果表, 成功抓取的日期)。"""
+        games_by_day = self.fetch_games_by_dates(days)
+        games = [g for day in days for g in games_by_day.get(day, [])]
+        return self._results_frame(games), [day for day in days if day in games_by_day]
+
+    @staticmethod
+    def _results_frame(games: list[dict[str, Any]]) -> pd.DataFrame:
         rows = []
         for g in games:
             home_score = g.get("home_team_score")
@@ -90,22 +111,38 @@ class NBADataFetcher:
 
         return pd.DataFrame(rows)
 
+    def fetch_games_by_dates(self, days: list[date]) -> dict[date, list[dict[str, Any]]]:
+        """并发抓取多个日期的比赛，整体吞吐受客户端限速器约束；抓取失败的日期不出现在结果中。"""
+        if not days:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(days))) as pool:
+            fetched = dict(zip(days, pool.map(self._try_fetch_games, days)))
+        return {day: games for day, games in fetched.items() if games is not None}
+
     def _fetch_games_by_date(self, day: date) -> list[dict[str, Any]]:
+        return self._try_fetch_games(day) or []
+
+    def _try_fetch_games(self, day: date) -> list[dict[str, Any]] | None:
+        """抓取单日比赛；失败时记录日志并返回 None，以便与“当日无比赛”区分。"""
         endpoint = f"{self.base_url}/games"
         params = {"dates[]": day.isoformat(), "per_page": 100}
         try:
-            response = requests.get(endpoint, params=params, timeout=self.timeout)
-            response.raise_for_status()
-            payload = response.json()
-            return payload.get("data", [])
-        except Exception as exc:  # noqa: BLE001
-            LOGGER.warning("获取赛程失败: %s", exc)
-            return []
+            return list(self.client.iter_pages(endpoint, params, ttl=self._page_ttl))
+        except (FetchError, CacheMiss, ValueError) as exc:
+            LOGGER.warning("获取 %s 赛程失败: %s", day.isoformat(), exc)
+            return None
+
+    @staticmethod
+    def _page_ttl(payload: dict[str, Any]) -> float | None:
+        """整页比赛均已完赛时永久缓存，否则按赛程数据的短期过期时间缓存。"""
+        games = payload.get("data", [])
+        if games and all(str(g.get("status", "")).startswith("Final") for g in games):
+            return None
+        return SCHEDULE_TTL_SECONDS
 
     @staticmethod
-    def _utc_to_beijing(utc_ts: str) -> str:
-        dt = datetime.fromisoformat(utc_ts.replace("Z", "+00:00"))
-        return dt.astimezone(BJ_TZ).strftime("%Y-%m-%d %H:%M")
+    def _utc_to_beijing(utc_ts: pd.Series) -> pd.Series:
+        return convert_utc_series_to_beijing(utc_ts, "%Y-%m-%d %H:%M")
 
     @staticmethod
     def _derive_mock_lines(home_team: str, away_team: str) -> tuple[float, float]:
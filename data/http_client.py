@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from nba_quant_model.src.response_cache import FetchedResponse, ResponseCache, TtlPolicy
+
+LOGGER = logging.getLogger(__name__)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+MAX_PAGES = 1000
+# 传输层的瞬时错误重试；其余 RequestException（重定向过多、URL 非法等）直接转为 FetchError
+TRANSIENT_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.ContentDecodingError,
+)
+
+
+class FetchError(RuntimeError):
+    """重试耗尽或遇到不可重试的错误。"""
+
+
+class RateLimiter:
+    """线程安全的令牌桶限速器。"""
+
+    def __init__(self, rate_per_sec: float, burst: int = 1) -> None:
+        self.rate = rate_per_sec
+        self.capacity = max(burst, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HTTPClient:
+    """带连接池、限速与抖动退避重试的 JSON 客户端，多线程共享同一实例。"""
+
+    def __init__(
+        self,
+        timeout: int = 15,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        rate_per_sec: float = 5.0,
+        burst: int = 5,
+        pool_size: int = 16,
+        cache: ResponseCache | None = None,
+    ) -> None:
+        self.timeout = timeout
+        self.cache = cache
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.limiter = RateLimiter(rate_per_sec, burst)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _backoff(self, attempt: int, retry_after: str | None = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        # full jitter：在 [0, base * 2^attempt] 内均匀取值
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def get(self, url: str, params: dict[str, Any] | None = None, headers: dict[str, str] | None = None) -> requests.Response:
+        """发起 GET；429/5xx 与瞬时网络错误按抖动指数退避重试，304 原样返回，其余请求错误抛出 FetchError。"""
+        last_error: Exception | None = None
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except TRANSIENT_ERRORS as exc:
+                last_error = exc
+                delay = self._backoff(attempt)
+            except requests.RequestException as exc:
+                raise FetchError(f"请求失败 {url}: {exc}") from exc
+            else:
+                if response.status_code not in RETRY_STATUS:
+                    if response.status_code != 304:
+                        try:
+                            response.raise_for_status()
+                        except requests.HTTPError as exc:
+                            raise FetchError(f"请求失败 {url}: {exc}") from exc
+                    return response
+                last_error = FetchError(f"HTTP {response.status_code}")
+                delay = self._backoff(attempt, response.headers.get("Retry-After"))
+
+            if attempt < self.max_retries:
+                LOGGER.info("请求 %s 失败(%s)，%.2fs 后第%d次重试", url, last_error, delay, attempt + 1)
+                time.sleep(delay)
+
+        raise FetchError(f"请求 {url} 重试{self.max_retries}次后仍失败: {last_error}")
+
+    def get_json(self, url: str, params: dict[str, Any] | None = None, ttl: TtlPolicy = 0) -> dict[str, Any]:
+        """请求 JSON；配置了响应缓存时按 ``ttl`` 缓存，并用 ETag/Last-Modified 做条件请求。"""
+        if self.cache is None:
+            return self.get(url, params=params).json()
+
+        def load(conditional: dict[str, str]) -> FetchedResponse:
+            response = self.get(url, params=params, headers=conditional or None)
+            if response.status_code == 304:
+                return FetchedResponse(not_modified=True)
+            return FetchedResponse(
+                payload=response.json(),
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+
+        return self.cache.fetch(url, dict(params or {}), load, ttl)
+
+    def iter_pages(
+        self, url: str, params: dict[str, Any] | None = None, ttl: TtlPolicy = 0, max_pages: int = MAX_PAGES
+    ) -> Iterator[dict[str, Any]]:
+        """逐页产出 ``data`` 中的记录，兼容 ``meta.next_cursor`` 游标与 ``meta.next_page`` 页码分页。
+
+        遇到空页、重复的游标/页码或超过 ``max_pages`` 页时停止，避免服务端分页异常导致死循环。
+        """
+        params = dict(params or {})
+        seen: set[tuple[str, Any]] = set()
+        for _ in range(max_pages):
+            payload = self.get_json(url, params=params, ttl=ttl)
+            records = payload.get("data", [])
+            yield from records
+            if not records:
+                return
+
+            meta = payload.get("meta") or {}
+            if meta.get("next_cursor") is not None:
+                key, value = "cursor", meta["next_cursor"]
+            elif meta.get("next_page") is not None:
+                key, value = "page", meta["next_page"]
+            else:
+                return
+            if (key, value) in seen:
+                LOGGER.warning("分页 %s 返回重复的 %s=%s，停止翻页", url, key, value)
+                return
+            seen.add((key, value))
+            params[key] = value
+
+        LOGGER.warning("分页 %s 超过 %d 页，停止翻页", url, max_pages)
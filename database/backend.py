@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import os
+
+from database.csv_store import CSVDatabase
+from database.sqlite_store import SQLiteDatabase
+
+BACKENDS = ("csv", "sqlite", "parquet")
+
+
+def get_database(backend: str | None = None):
+    """按配置返回存储后端，默认读取环境变量 DB_BACKEND（csv / sqlite / parquet）。"""
+    name = (backend or os.getenv("DB_BACKEND", "csv")).strip().lower()
+    if name == "csv":
+        return CSVDatabase()
+    if name == "sqlite":
+        return SQLiteDatabase(os.getenv("SQLITE_PATH", "database/storage/nba.sqlite3"))
+    if name == "parquet":
+        # pyarrow 仅在选用 Parquet 后端时导入
+        from database.parquet_store import ParquetDatabase
+
+        return ParquetDatabase(os.getenv("PARQUET_PATH", "database/storage/parquet"))
+    raise ValueError(f"未知存储后端: {name}，可选 {BACKENDS}")
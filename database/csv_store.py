@@ -4,8 +4,15 @@ from pathlib import Path
 
 import pandas as pd
 
+from model.performance import ROLLUP_COLUMNS
+
+PREDICTION_KEYS = ["game_id", "run_date_bj"]
+RESULT_KEYS = ["game_id"]
+
 
 class CSVDatabase:
+    backend_name = "CSV"
+
     def __init__(self, base_path: str = "database/storage") -> None:
         self.base = Path(base_path)
         self.base.mkdir(parents=True, exist_ok=True)
@@ -13,6 +20,8 @@ class CSVDatabase:
         self.predictions_file = self.base / "predictions.csv"
         self.results_file = self.base / "results.csv"
         self.model_state_file = self.base / "model_state.csv"
+        self.rollup_file = self.base / "performance_rollup.csv"
+        self._key_cache: dict[Path, tuple[tuple[int, int], set[tuple[str, ...]]]] = {}
 
         self._ensure_file(self.predictions_file, [
             "run_date_bj", "game_id", "home_team", "away_team", "game_time_bj",
@@ -23,6 +32,7 @@ class CSVDatabase:
             "sync_date_bj", "game_id", "home_team", "away_team", "home_score", "away_score", "total_score"
         ])
         self._ensure_file(self.model_state_file, ["updated_at_bj", "team", "offense_rating", "defense_rating", "pace"])
+        self._ensure_file(self.rollup_file, ROLLUP_COLUMNS)
 
     @staticmethod
     def _ensure_file(path: Path, headers: list[str]) -> None:
@@ -30,23 +40,93 @@ class CSVDatabase:
             pd.DataFrame(columns=headers).to_csv(path, index=False)
 
     @staticmethod
-    def append_rows(path: Path, df: pd.DataFrame) -> None:
+    def key_index_path(path: Path) -> Path:
+        return path.with_name(f"{path.stem}.keys.csv")
+
+    @staticmethod
+    def _stamp(path: Path) -> tuple[int, int]:
+        stat = path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def version(self) -> tuple:
+        """由各数据文件的修改时间与大小组成的版本号，任何写入都会改变它。"""
+        files = (self.predictions_file, self.results_file, self.model_state_file, self.rollup_file)
+        return tuple(self._stamp(p) for p in files)
+
+    def _load_keys(self, path: Path, key_cols: list[str]) -> set[tuple[str, ...]]:
+        """读取去重键索引；索引缺失或早于数据文件（被外部改写）时从数据文件重建。"""
+        cached = self._key_cache.get(path)
+        if cached is not None and cached[0] == self._stamp(path):
+            return cached[1]
+
+        index_path = self.key_index_path(path)
+        if index_path.exists() and index_path.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+            keys_df = pd.read_csv(index_path, dtype=str, keep_default_na=False)
+        else:
+            keys_df = self._rebuild_key_index(path, key_cols)
+
+        keys = set(zip(*(keys_df[c] for c in key_cols)))
+        self._key_cache[path] = (self._stamp(path), keys)
+        return keys
+
+    def _rebuild_key_index(self, path: Path, key_cols: list[str]) -> pd.DataFrame:
+        keys_df = pd.read_csv(path, usecols=key_cols, dtype=str, keep_default_na=False)[key_cols]
+        keys_df.drop_duplicates().to_csv(self.key_index_path(path), index=False)
+        self._key_cache.pop(path, None)
+        return keys_df
+
+    def append_rows(self, path: Path, df: pd.DataFrame, key_cols: list[str]) -> pd.DataFrame:
+        """只追加键不在索引中的新行，不读取、不重写已有数据，返回实际写入的行。"""
         if df.empty:
-            return
-        existing = pd.read_csv(path)
-        merged = pd.concat([existing, df], ignore_index=True)
-        merged.drop_duplicates(inplace=True)
-        merged.to_csv(path, index=False)
+            return df
 
-    def save_predictions(self, predictions_df: pd.DataFrame) -> None:
-        self.append_rows(self.predictions_file, predictions_df)
+        keys = self._load_keys(path, key_cols)
+        row_keys = pd.Series(list(zip(*(df[c].astype(str) for c in key_cols))), index=df.index)
+        known = pd.Series([k in keys for k in row_keys], index=df.index, dtype=bool)
+        fresh = df[~known & ~row_keys.duplicated()]
+        if fresh.empty:
+            return fresh
 
-    def save_results(self, results_df: pd.DataFrame) -> None:
-        self.append_rows(self.results_file, results_df)
+        header = pd.read_csv(path, nrows=0).columns.tolist()
+        if set(fresh.columns) - set(header):
+            # 新增列时才整表重写一次，之后恢复纯追加
+            merged = pd.concat([pd.read_csv(path), fresh], ignore_index=True)
+            merged.to_csv(path, index=False)
+        else:
+            fresh.reindex(columns=header).to_csv(path, mode="a", header=False, index=False)
+
+        fresh[key_cols].astype(str).to_csv(self.key_index_path(path), mode="a", header=False, index=False)
+        keys.update(row_keys[fresh.index])
+        self._key_cache[path] = (self._stamp(path), keys)
+        return fresh
+
+    def compact(self) -> dict[str, int]:
+        """按去重键压实预测与赛果文件并重建键索引，返回各文件删除的重复行数。"""
+        removed = {}
+        for path, key_cols in ((self.predictions_file, PREDICTION_KEYS), (self.results_file, RESULT_KEYS)):
+            df = pd.read_csv(path, dtype={c: str for c in key_cols}, keep_default_na=False, na_values=[""])
+            deduped = df.drop_duplicates(subset=key_cols, keep="first")
+            removed[path.name] = len(df) - len(deduped)
+            if removed[path.name]:
+                deduped.to_csv(path, index=False)
+            self._rebuild_key_index(path, key_cols)
+        return removed
+
+    def save_predictions(self, predictions_df: pd.DataFrame) -> pd.DataFrame:
+        return self.append_rows(self.predictions_file, predictions_df, PREDICTION_KEYS)
+
+    def save_results(self, results_df: pd.DataFrame) -> pd.DataFrame:
+        return self.append_rows(self.results_file, results_df, RESULT_KEYS)
 
     def save_model_state(self, model_state_df: pd.DataFrame) -> None:
         model_state_df.to_csv(self.model_state_file, index=False)
 
+    def save_rollup(self, rollup_df: pd.DataFrame) -> None:
+        rollup_df.to_csv(self.rollup_file, index=False)
+
+    def load_rollup(self) -> pd.DataFrame:
+        return pd.read_csv(self.rollup_file, dtype={"day": str, "market": str, "stars": str})
+
     def load_results(self) -> pd.DataFrame:
         return pd.read_csv(self.results_file)
 
@@ -55,3 +135,25 @@ class CSVDatabase:
 
     def load_model_state(self) -> pd.DataFrame:
         return pd.read_csv(self.model_state_file)
+
+    def count_predictions(self) -> int:
+        return len(self._load_keys(self.predictions_file, PREDICTION_KEYS))
+
+    def load_predictions_for_games(self, game_ids: list[str]) -> pd.DataFrame:
+        """分块扫描预测文件，只保留指定比赛的预测。"""
+        wanted = set(map(str, game_ids))
+        chunks = [
+            chunk[chunk["game_id"].isin(wanted)]
+            for chunk in pd.read_csv(self.predictions_file, dtype={"game_id": str}, chunksize=50000)
+        ]
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.read_csv(self.predictions_file, nrows=0)
+
+    def load_latest_predictions(self) -> pd.DataFrame:
+        df = self.load_predictions()
+        if df.empty:
+            return df
+        return df[df["run_date_bj"] == df["run_date_bj"].max()].copy()
+
+    def load_settled_predictions(self) -> pd.DataFrame:
+        results = self.load_results()[["game_id", "home_score", "away_score", "total_score"]]
+        return self.load_predictions().merge(results, on="game_id", how="inner")
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+from database.csv_store import PREDICTION_KEYS, RESULT_KEYS
+from model.performance import ROLLUP_COLUMNS
+
+PREDICTION_PARTITION = ("run_date", "run_date_bj")
+RESULT_PARTITION = ("sync_date", "sync_date_bj")
+FLOAT_COLUMNS = [
+    "spread_line", "total_line", "spread_prob", "total_prob", "home_proj", "away_proj",
+    "home_score", "away_score", "total_score",
+]
+
+
+class ParquetDatabase:
+    """按日期分区的 Parquet 存储，接口与 CSVDatabase 一致。
+
+    预测按 ``run_date_bj`` 的日期、赛果按 ``sync_date_bj`` 的日期分区（hive 目录
+    ``run_date=YYYY-MM-DD``），每个分区一个文件。读取支持列裁剪与日期范围下推，
+    并通过内存映射读取；写入只重写涉及的分区。
+    """
+
+    backend_name = "Parquet"
+
+    def __init__(self, base_path: str = "database/storage/parquet") -> None:
+        self.base = Path(base_path)
+        self.predictions_dir = self.base / "predictions"
+        self.results_dir = self.base / "results"
+        self.model_state_file = self.base / "model_state.parquet"
+        self.rollup_file = self.base / "performance_rollup.parquet"
+        self.version_file = self.base / "_version"
+        self.predictions_dir.mkdir(parents=True, exist_ok=True)
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        self._fs = fs.LocalFileSystem(use_mmap=True)
+
+    @staticmethod
+    def _normalize(df: pd.DataFrame, key_cols: list[str]) -> pd.DataFrame:
+        df = df.copy()
+        for col in key_cols:
+            df[col] = df[col].astype(str)
+        for col in FLOAT_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype("float64")
+        return df
+
+    @staticmethod
+    def _partition_file(directory: Path, field: str, day: str) -> Path:
+        return directory / f"{field}={day}" / "part-0.parquet"
+
+    def version(self) -> str:
+        """存储版本计数：每次写入分区或模型状态后更新。"""
+        return self.version_file.read_text() if self.version_file.exists() else ""
+
+    def _write_partition(self, path: Path, df: pd.DataFrame) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp)
+        os.replace(tmp, path)
+        self.version_file.write_text(str(time.time_ns()))
+
+    def _read_partition(self, path: Path) -> pd.DataFrame:
+        return pq.read_table(path, memory_map=True).to_pandas()
+
+    def _append(
+        self,
+        directory: Path,
+        partition: tuple[str, str],
+        df: pd.DataFrame,
+        key_cols: list[str],
+        global_keys: bool,
+    ) -> pd.DataFrame:
+        """只重写新行落入的分区，保留已存在键的首条记录，返回实际写入的行。"""
+        if df.empty:
+            return df
+
+        field, source_col = partition
+        df = self._normalize(df, key_cols).drop_duplicates(subset=key_cols, keep="first")
+        if global_keys:
+            # 键不含分区日期时需跨分区去重，只读取键列
+            existing = self._load(directory, partition, columns=key_cols)
+            df = df[~self._known_keys(df, existing, key_cols)]
+
+        written = []
+        days = df[source_col].astype(str).str[:10]
+        for day, part in df.groupby(days, sort=True):
+            path = self._partition_file(directory, field, day)
+            if path.exists():
+                current = self._read_partition(path)
+                part = part[~self._known_keys(part, current, key_cols)]
+                if part.empty:
+                    continue
+                merged = pd.concat([current, part], ignore_index=True)
+            else:
+                merged = part
+            self._write_partition(path, merged)
+            written.append(part)
+
+        return pd.concat(written, ignore_index=True) if written else df.iloc[0:0]
+
+    @staticmethod
+    def _known_keys(df: pd.DataFrame, existing: pd.DataFrame, key_cols: list[str]) -> pd.Series:
+        keys = set(existing[key_cols].astype(str).itertuples(index=False, name=None))
+        return pd.Series(
+            [k in keys for k in df[key_cols].itertuples(index=False, name=None)], index=df.index, dtype=bool
+        )
+
+    def _dataset(self, directory: Path, partition: tuple[str, str]) -> ds.Dataset | None:
+        field, _ = partition
+        files = sorted(str(p) for p in directory.glob("*/part-0.parquet"))
+        if not files:
+            return None
+        # 各分区可能因新增列而结构不同，合并各文件 footer 中的 schema
+        schema = pa.unify_schemas([pq.read_schema(f) for f in files], promote_options="permissive")
+        schema = schema.append(pa.field(field, pa.string()))
+        partitioning = ds.partitioning(pa.schema([(field, pa.string())]), flavor="hive")
+        return ds.dataset(
+            files,
+            schema=schema,
+            format="parquet",
+            partitioning=partitioning,
+            partition_base_dir=str(directory),
+            filesystem=self._fs,
+        )
+
+    def _load(
+        self,
+        directory: Path,
+        partition: tuple[str, str],
+        columns: list[str] | None = None,
+        start: str | None = None,
+        end: str | None = None,
+    ) -> pd.DataFrame:
+        field, _ = partition
+        dataset = self._dataset(directory, partition)
+        if dataset is None:
+            return pd.DataFrame(columns=columns or [])
+        predicate = None
+        if start is not None:
+            predicate = ds.field(field) >= start[:10]
+        if end is not None:
+            upper = ds.field(field) <= end[:10]
+            predicate = upper if predicate is None else predicate & upper
+
+        names = [c for c in dataset.schema.names if c != field]
+        table = dataset.to_table(columns=columns or names, filter=predicate)
+        return table.to_pandas()
+
+    def save_predictions(self, predictions_df: pd.DataFrame) -> pd.DataFrame:
+        return self._append(self.predictions_dir, PREDICTION_PARTITION, predictions_df, PREDICTION_KEYS, False)
+
+    def save_results(self, results_df: pd.DataFrame) -> pd.DataFrame:
+        return self._append(self.results_dir, RESULT_PARTITION, results_df, RESULT_KEYS, True)
+
+    def save_model_state(self, model_state_df: pd.DataFrame) -> None:
+        self._write_partition(self.model_state_file, model_state_df)
+
+    def save_rollup(self, rollup_df: pd.DataFrame) -> None:
+        self._write_partition(self.rollup_file, rollup_df[ROLLUP_COLUMNS])
+
+    def compact(self) -> dict[str, int]:
+        """分区文件写入时已去重，压实只清理写入中断遗留的临时文件。"""
+        removed = 0
+        for tmp in self.base.rglob("*.tmp"):
+            tmp.unlink()
+            removed += 1
+        return {"tmp_files": removed}
+
+    def load_results(
+        self, columns: list[str] | None = None, start: str | None = None, end: str | None = None
+    ) -> pd.DataFrame:
+        """按同步日期范围（含两端）与列读取赛果。"""
+        return self._load(self.results_dir, RESULT_PARTITION, columns, start, end)
+
+    def load_predictions(
+        self, columns: list[str] | None = None, start: str | None = None, end: str | None = None
+    ) -> pd.DataFrame:
+        """按预测日期范围（含两端）与列读取预测。"""
+        return self._load(self.predictions_dir, PREDICTION_PARTITION, columns, start, end)
+
+    def load_model_state(self) -> pd.DataFrame:
+        if not self.model_state_file.exists():
+            return pd.DataFrame(columns=["updated_at_bj", "team", "offense_rating", "defense_rating", "pace"])
+        return self._read_partition(self.model_state_file)
+
+    def load_rollup(self) -> pd.DataFrame:
+        if not self.rollup_file.exists():
+            return pd.DataFrame(columns=ROLLUP_COLUMNS)
+        return self._read_partition(self.rollup_file)
+
+    def load_predictions_for_games(self, game_ids: list[str]) -> pd.DataFrame:
+        """以 game_id 谓词扫描各分区，只物化匹配的行。"""
+        dataset = self._dataset(self.predictions_dir, PREDICTION_PARTITION)
+        if dataset is None:
+            return pd.DataFrame()
+        names = [c for c in dataset.schema.names if c != PREDICTION_PARTITION[0]]
+        predicate = ds.field("game_id").isin([str(g) for g in game_ids])
+        return dataset.to_table(columns=names, filter=predicate).to_pandas()
+
+    def count_predictions(self) -> int:
+        """仅读取分区文件元数据计数。"""
+        return sum(
+            pq.read_metadata(path).num_rows for path in self.predictions_dir.glob("*/part-0.parquet")
+        )
+
+    def load_latest_predictions(self) -> pd.DataFrame:
+        days = sorted(p.name.split("=", 1)[1] for p in self.predictions_dir.glob(f"{PREDICTION_PARTITION[0]}=*"))
+        if not days:
+            return self.load_predictions()
+        df = self._read_partition(self._partition_file(self.predictions_dir, PREDICTION_PARTITION[0], days[-1]))
+        return df[df["run_date_bj"] == df["run_date_bj"].max()].reset_index(drop=True)
+
+    def load_settled_predictions(self) -> pd.DataFrame:
+        predictions = self.load_predictions()
+        if predictions.empty:
+            return predictions
+        results = self.load_results(columns=["game_id", "home_score", "away_score", "total_score"])
+        return predictions.merge(results, on="game_id", how="inner")
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+import pandas as pd
+
+from database.csv_store import PREDICTION_KEYS, RESULT_KEYS
+from model.performance import ROLLUP_COLUMNS, ROLLUP_KEYS
+
+PREDICTION_COLUMNS = {
+    "run_date_bj": "TEXT NOT NULL",
+    "game_id": "TEXT NOT NULL",
+    "home_team": "TEXT",
+    "away_team": "TEXT",
+    "game_time_bj": "TEXT",
+    "spread_line": "REAL",
+    "total_line": "REAL",
+    "spread_pick": "TEXT",
+    "total_pick": "TEXT",
+    "stars": "TEXT",
+    "spread_prob": "REAL",
+    "total_prob": "REAL",
+    "home_proj": "REAL",
+    "away_proj": "REAL",
+}
+ROLLUP_SQL_TYPES = {"settled": "INTEGER", "bets": "INTEGER", "hits": "INTEGER", "units": "REAL"}
+RESULT_COLUMNS = {
+    "sync_date_bj": "TEXT",
+    "game_id": "TEXT NOT NULL",
+    "game_date_utc": "TEXT",
+    "home_team": "TEXT",
+    "away_team": "TEXT",
+    "home_score": "INTEGER",
+    "away_score": "INTEGER",
+    "total_score": "INTEGER",
+}
+
+
+class SQLiteDatabase:
+    """与 CSVDatabase 接口一致的 SQLite 存储，按主键 upsert 并为常用查询建立索引。"""
+
+    backend_name = "SQLite"
+
+    def __init__(self, db_path: str = "database/storage/nba.sqlite3") -> None:
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._connect() as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._create_table(conn, "predictions", PREDICTION_COLUMNS, PREDICTION_KEYS)
+            self._create_table(conn, "results", RESULT_COLUMNS, RESULT_KEYS)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_predictions_run_date ON predictions(run_date_bj)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_results_home_team ON results(home_team)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_results_away_team ON results(away_team)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS model_state ("
+                "updated_at_bj TEXT, team TEXT PRIMARY KEY, offense_rating REAL, defense_rating REAL, pace REAL)"
+            )
+            rollup_cols = ", ".join(f"{c} {ROLLUP_SQL_TYPES.get(c, 'TEXT')}" for c in ROLLUP_COLUMNS)
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS performance_rollup ({rollup_cols}, PRIMARY KEY ({', '.join(ROLLUP_KEYS)}))"
+            )
+
+    def version(self) -> tuple:
+        """数据库文件及其 WAL 文件的修改时间与大小，任何提交都会改变它。"""
+        stamps = []
+        for path in (self.db_path, self.db_path.with_name(self.db_path.name + "-wal")):
+            if path.exists():
+                stat = path.stat()
+                stamps.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(stamps)
+
+    def _connect(self) -> closing[sqlite3.Connection]:
+        return closing(sqlite3.connect(self.db_path))
+
+    @staticmethod
+    def _create_table(conn: sqlite3.Connection, table: str, columns: dict[str, str], keys: list[str]) -> None:
+        cols = ", ".join(f"{name} {sql_type}" for name, sql_type in columns.items())
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({cols}, PRIMARY KEY ({', '.join(keys)}))")
+
+    @staticmethod
+    def _ensure_columns(conn: sqlite3.Connection, table: str, columns: list[str]) -> None:
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for col in columns:
+            if col not in existing:
+                conn.execute(f'ALTER TABLE {table} ADD COLUMN "{col}"')
+
+    def _insert_new(self, table: str, df: pd.DataFrame, key_cols: list[str]) -> pd.DataFrame:
+        """按主键插入新行，已存在的键保留首次写入的记录（与 CSV/Parquet 后端一致），返回新插入的行。"""
+        if df.empty:
+            return df
+
+        df = df.drop_duplicates(subset=key_cols, keep="first").copy()
+        for col in key_cols:
+            df[col] = df[col].astype(str)
+        cols = list(df.columns)
+        col_list = ", ".join(f'"{c}"' for c in cols)
+        placeholders = ", ".join("?" for _ in cols)
+        sql = (
+            f"INSERT INTO {table} ({col_list}) VALUES ({placeholders}) "
+            f"ON CONFLICT ({', '.join(key_cols)}) DO NOTHING"
+        )
+        key_where = " AND ".join(f"{c} = ?" for c in key_cols)
+
+        with self._connect() as conn, conn:
+            self._ensure_columns(conn, table, cols)
+            is_new = [
+                conn.execute(f"SELECT 1 FROM {table} WHERE {key_where}", key).fetchone() is None
+                for key in df[key_cols].itertuples(index=False, name=None)
+            ]
+            rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+            conn.executemany(sql, rows)
+
+        return df[is_new]
+
+    def save_predictions(self, predictions_df: pd.DataFrame) -> pd.DataFrame:
+        return self._insert_new("predictions", predictions_df, PREDICTION_KEYS)
+
+    def save_results(self, results_df: pd.DataFrame) -> pd.DataFrame:
+        return self._insert_new("results", results_df, RESULT_KEYS)
+
+    def save_model_state(self, model_state_df: pd.DataFrame) -> None:
+        with self._connect() as conn, conn:
+            model_state_df.to_sql("model_state", conn, if_exists="replace", index=False)
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_model_state_team ON model_state(team)")
+
+    def save_rollup(self, rollup_df: pd.DataFrame) -> None:
+        rows = rollup_df[ROLLUP_COLUMNS].astype(object).itertuples(index=False, name=None)
+        with self._connect() as conn, conn:
+            conn.execute("DELETE FROM performance_rollup")
+            conn.executemany(f"INSERT INTO performance_rollup VALUES ({', '.join('?' for _ in ROLLUP_COLUMNS)})", rows)
+
+    def compact(self) -> dict[str, int]:
+        """主键保证无重复行，压实仅回收空间并刷新查询统计。"""
+        with self._connect() as conn:
+            conn.execute("VACUUM")
+            conn.execute("ANALYZE")
+        return {}
+
+    def _query(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        with self._connect() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def load_results(self) -> pd.DataFrame:
+        return self._query("SELECT * FROM results")
+
+    def load_predictions(self) -> pd.DataFrame:
+        return self._query("SELECT * FROM predictions")
+
+    def load_model_state(self) -> pd.DataFrame:
+        return self._query("SELECT * FROM model_state")
+
+    def load_rollup(self) -> pd.DataFrame:
+        return self._query("SELECT * FROM performance_rollup")
+
+    def load_predictions_for_games(self, game_ids: list[str]) -> pd.DataFrame:
+        """按 game_id 主键前缀索引查询指定比赛的预测。"""
+        ids = [str(g) for g in dict.fromkeys(game_ids)]
+        frames = []
+        for start in range(0, len(ids), 500):
+            batch = ids[start : start + 500]
+            sql = f"SELECT * FROM predictions WHERE game_id IN ({', '.join('?' for _ in batch)})"
+            frames.append(self._query(sql, tuple(batch)))
+        return pd.concat(frames, ignore_index=True) if frames else self._query("SELECT * FROM predictions LIMIT 0")
+
+    def count_predictions(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+    def load_latest_predictions(self) -> pd.DataFrame:
+        """最近一次预测任务的全部预测，走 run_date_bj 索引。"""
+        return self._query(
+            "SELECT * FROM predictions WHERE run_date_bj = (SELECT MAX(run_date_bj) FROM predictions)"
+        )
+
+    def load_settled_predictions(self) -> pd.DataFrame:
+        """与赛果按 game_id 关联后的预测（即已可结算的预测）。"""
+        return self._query(
+            "SELECT p.*, r.home_score, r.away_score, r.total_score "
+            "FROM predictions p JOIN results r ON r.game_id = p.game_id"
+        )
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from model.rating_model import TeamStrengthModel
+
+GAMES_PER_SEASON = 1230
+
+
+def synthetic_results(
+    seasons: int, leagues: int = 1, teams_per_league: int = 30, seed: int = 7
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """按已知的进攻/失分效应生成模拟赛果，返回 (赛果表, 真实评分)。"""
+    rng = np.random.default_rng(seed)
+    n_teams = leagues * teams_per_league
+    teams = np.array([f"L{i // teams_per_league}-T{i % teams_per_league:02d}" for i in range(n_teams)])
+    offense = rng.normal(0, 4, n_teams)
+    allowed = rng.normal(0, 4, n_teams)
+
+    n_games = seasons * GAMES_PER_SEASON * leagues
+    league = rng.integers(0, leagues, n_games)
+    home = league * teams_per_league + rng.integers(0, teams_per_league, n_games)
+    away = league * teams_per_league + (home % teams_per_league + rng.integers(1, teams_per_league, n_games)) % teams_per_league
+    home_score = np.rint(112 + 2.5 + offense[home] + allowed[away] + rng.normal(0, 11.5, n_games))
+    away_score = np.rint(112 + offense[away] + allowed[home] + rng.normal(0, 11.5, n_games))
+    dates = pd.Timestamp("2021-10-19") + pd.to_timedelta(np.sort(rng.integers(0, seasons * 365, n_games)), unit="D")
+
+    results = pd.DataFrame(
+        {
+            "game_id": np.arange(n_games).astype(str),
+            "game_date_utc": dates.strftime("%Y-%m-%dT00:00:00.000Z"),
+            "home_team": teams[home],
+            "away_team": teams[away],
+            "home_score": home_score,
+            "away_score": away_score,
+        }
+    )
+    results["total_score"] = results["home_score"] + results["away_score"]
+    truth = pd.DataFrame({"team": teams, "offense_rating": offense, "defense_rating": -allowed})
+    return results, truth
+
+
+def _timed(fn, repeat: int) -> tuple[float, pd.DataFrame]:
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def _rmse(state: pd.DataFrame, truth: pd.DataFrame) -> float:
+    joined = state.merge(truth, on="team", suffixes=("", "_true"))
+    err = []
+    for col in ("offense_rating", "defense_rating"):
+        # 两种方法的评分都以联盟均值为零点，比较前各自去中心化
+        est = joined[col] - joined[col].mean()
+        true = joined[f"{col}_true"] - joined[f"{col}_true"].mean()
+        err.append((est - true).to_numpy() ** 2)
+    return float(np.sqrt(np.mean(np.concatenate(err))))
+
+
+def run(seasons: int, leagues: int, repeat: int) -> pd.DataFrame:
+    """比较场均方式与 ridge 方式（冷启动 / 以前一日状态热启动）的拟合耗时与评分误差。"""
+    results, truth = synthetic_results(seasons, leagues)
+    last_day = results["game_date_utc"].max()
+    history = results[results["game_date_utc"] < last_day]
+
+    means = TeamStrengthModel()
+    ridge = TeamStrengthModel(method="ridge")
+    previous = ridge.ratings_state(ridge.fit_state(history), history)
+
+    rows = []
+    for label, fn in (
+        ("means", lambda: means.ratings_state(means.fit_state(results), results)),
+        ("ridge (cold)", lambda: ridge.ratings_state(ridge.fit_state(results), results)),
+        ("ridge (warm)", lambda: ridge.ratings_state(ridge.fit_state(results), results, previous)),
+    ):
+        seconds, state = _timed(fn, repeat)
+        rows.append({"method": label, "games": len(results), "fit_ms": seconds * 1000, "rmse": _rmse(state, truth)})
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="球队强度拟合基准")
+    parser.add_argument("--seasons", type=int, default=3)
+    parser.add_argument("--leagues", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(run(args.seasons, args.leagues, args.repeat).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
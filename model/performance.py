@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+WIN_UNITS = 0.91
+ROLLUP_KEYS = ["day", "market", "stars"]
+ROLLUP_COLUMNS = ROLLUP_KEYS + ["settled", "bets", "hits", "units"]
+
+
+def settle_predictions(merged: pd.DataFrame) -> pd.DataFrame:
+    """对已关联赛果的预测做向量化结算。
+
+    每个市场新增 ``*_bet`` / ``*_hit`` / ``*_units`` 三列；命中按 -110 赔率计 +0.91 单位，
+    走盘（恰好等于盘口）既不算命中也不计盈亏，未中计 -1 单位。
+    """
+    out = merged.copy()
+    margin = (out["home_score"] - out["away_score"]).to_numpy(dtype=float)
+    total = out["total_score"].to_numpy(dtype=float)
+    spread_line = out["spread_line"].to_numpy(dtype=float)
+    total_line = out["total_line"].to_numpy(dtype=float)
+
+    spread_pick = out["spread_pick"].astype(str)
+    spread_bet = (spread_pick != "No Bet").to_numpy()
+    spread_hit = (spread_pick.str.endswith("让分").to_numpy() & (margin > spread_line)) | (
+        spread_pick.str.endswith("受让").to_numpy() & (margin < spread_line)
+    )
+    spread_push = spread_bet & (margin == spread_line)
+
+    total_pick = out["total_pick"].astype(str).to_numpy()
+    total_bet = total_pick != "No Bet"
+    total_hit = ((total_pick == "大分") & (total > total_line)) | ((total_pick == "小分") & (total < total_line))
+    total_push = total_bet & (total == total_line)
+
+    for market, bet, hit, push in (
+        ("spread", spread_bet, spread_hit, spread_push),
+        ("total", total_bet, total_hit, total_push),
+    ):
+        out[f"{market}_bet"] = bet.astype(int)
+        out[f"{market}_hit"] = (bet & hit).astype(int)
+        out[f"{market}_units"] = np.where(~bet | push, 0.0, np.where(hit, WIN_UNITS, -1.0))
+    return out
+
+
+def build_rollup(settled: pd.DataFrame) -> pd.DataFrame:
+    """按 (预测日期, 市场, 星级) 汇总已结算预测的样本、下注、命中与盈亏单位。"""
+    if settled.empty:
+        return pd.DataFrame(columns=ROLLUP_COLUMNS)
+
+    base = pd.DataFrame(
+        {"day": settled["run_date_bj"].astype(str).str[:10], "stars": settled["stars"].astype(str), "settled": 1}
+    )
+    frames = []
+    for market in ("spread", "total"):
+        frame = base.assign(
+            market=market,
+            bets=settled[f"{market}_bet"].to_numpy(),
+            hits=settled[f"{market}_hit"].to_numpy(),
+            units=settled[f"{market}_units"].to_numpy(),
+        )
+        frames.append(frame)
+    rollup = pd.concat(frames, ignore_index=True).groupby(ROLLUP_KEYS, as_index=False)[
+        ["settled", "bets", "hits", "units"]
+    ].sum()
+    return rollup[ROLLUP_COLUMNS]
+
+
+def merge_rollup(existing: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    """把新结算场次的增量汇总叠加到已有汇总表。"""
+    if existing.empty:
+        return delta[ROLLUP_COLUMNS].reset_index(drop=True)
+    if delta.empty:
+        return existing[ROLLUP_COLUMNS].reset_index(drop=True)
+    merged = pd.concat([existing[ROLLUP_COLUMNS], delta[ROLLUP_COLUMNS]], ignore_index=True)
+    merged["day"] = merged["day"].astype(str)
+    merged["stars"] = merged["stars"].astype(str)
+    return merged.groupby(ROLLUP_KEYS, as_index=False)[["settled", "bets", "hits", "units"]].sum()
+
+
+def rebuild_rollup(store) -> pd.DataFrame:
+    """由存储中全部已关联赛果的预测全量构建表现汇总表并保存。"""
+    settled = store.load_settled_predictions()
+    if settled.empty:
+        return pd.DataFrame(columns=ROLLUP_COLUMNS)
+    rollup = build_rollup(settle_predictions(settled))
+    store.save_rollup(rollup)
+    return rollup
+
+
+def load_or_build_rollup(store) -> pd.DataFrame:
+    """读取表现汇总表；为空时（如升级前已有的存储）全量构建一次。"""
+    rollup = store.load_rollup()
+    if not rollup.empty:
+        return rollup
+    return rebuild_rollup(store)
@@ -1,8 +1,19 @@
 from __future__ import annotations
 
+import logging
 from dataclasses import dataclass
+from typing import Iterable, Iterator
 
+import numpy as np
 import pandas as pd
+from scipy import sparse
+from scipy.sparse.linalg import cg
+
+LOGGER = logging.getLogger(__name__)
+FIT_METHODS = ("means", "ridge")
+
+ACCUMULATOR_COLUMNS = ["games", "weight", "points_for_sum", "points_against_sum", "as_of", "half_life_days"]
+MODEL_STATE_COLUMNS = ["updated_at_bj", "team", "offense_rating", "defense_rating", "pace"] + ACCUMULATOR_COLUMNS
 
 
 @dataclass
@@ -13,41 +24,294 @@ class TeamProfile:
     pace: float
 
 
+class TeamView:
+    """TeamTable 中单支球队的只读视图，属性与 TeamProfile 一致。"""
+
+    __slots__ = ("team", "_table", "_idx")
+
+    def __init__(self, table: TeamTable, idx: int, team: str) -> None:
+        self.team = team
+        self._table = table
+        self._idx = idx
+
+    @property
+    def offense_rating(self) -> float:
+        return float(self._table.offense[self._idx])
+
+    @property
+    def defense_rating(self) -> float:
+        return float(self._table.defense[self._idx])
+
+    @property
+    def pace(self) -> float:
+        return float(self._table.pace[self._idx])
+
+    def __repr__(self) -> str:
+        return (
+            f"TeamView(team={self.team!r}, offense_rating={self.offense_rating}, "
+            f"defense_rating={self.defense_rating}, pace={self.pace})"
+        )
+
+
+class TeamTable:
+    """球队评分表：球队名到行号的映射加连续的 NumPy 数组。
+
+    数组末尾额外保留一行默认参数（与 ``TeamStrengthModel.default_profile`` 一致），
+    未知球队的行号指向该行，批量模拟可直接用主客队行号数组做花式索引。
+    用法与 ``dict[str, TeamProfile]`` 相同，取值返回 ``TeamView``。
+    """
+
+    def __init__(self, teams: Iterable[str], offense: np.ndarray, defense: np.ndarray, pace: np.ndarray) -> None:
+        self.teams = [str(t) for t in teams]
+        if not (len(offense) == len(defense) == len(pace) == len(self.teams)):
+            raise ValueError("球队评分数组长度不一致")
+        self.index = {team: i for i, team in enumerate(self.teams)}
+        default = TeamStrengthModel.default_profile("")
+        self.offense = np.append(np.asarray(offense, dtype=float), default.offense_rating)
+        self.defense = np.append(np.asarray(defense, dtype=float), default.defense_rating)
+        self.pace = np.append(np.asarray(pace, dtype=float), default.pace)
+
+    @classmethod
+    def from_state(cls, state_df: pd.DataFrame) -> TeamTable:
+        """由模型状态表构建。"""
+        return cls(
+            state_df["team"].astype(str).tolist(),
+            state_df["offense_rating"].to_numpy(dtype=float),
+            state_df["defense_rating"].to_numpy(dtype=float),
+            state_df["pace"].to_numpy(dtype=float),
+        )
+
+    @property
+    def default_index(self) -> int:
+        return len(self.teams)
+
+    def indices(self, teams: Iterable[str]) -> np.ndarray:
+        """球队名批量转行号，未知球队映射到默认参数行。"""
+        default = self.default_index
+        return np.fromiter((self.index.get(t, default) for t in teams), dtype=np.intp)
+
+    def profile(self, team: str) -> TeamView:
+        """取球队视图，未知球队返回默认参数。"""
+        return TeamView(self, self.index.get(team, self.default_index), team)
+
+    def get(self, team: str, default: TeamView | TeamProfile | None = None) -> TeamView | TeamProfile | None:
+        idx = self.index.get(team)
+        return default if idx is None else TeamView(self, idx, team)
+
+    def __getitem__(self, team: str) -> TeamView:
+        return TeamView(self, self.index[team], team)
+
+    def __contains__(self, team: object) -> bool:
+        return team in self.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.teams)
+
+    def __len__(self) -> int:
+        return len(self.teams)
+
+    def values(self) -> list[TeamView]:
+        return [TeamView(self, i, team) for i, team in enumerate(self.teams)]
+
+
 class TeamStrengthModel:
-    """基于历史赛果生成简易球队强度参数，可持续重校准。"""
+    """基于历史赛果生成简易球队强度参数，可持续重校准。
 
-    def fit(self, results_df: pd.DataFrame) -> dict[str, TeamProfile]:
-        if results_df.empty:
-            return {}
+    模型状态按球队保存得失分的累计和与场次（``ACCUMULATOR_COLUMNS``），每日复盘只需把
+    新完赛的比赛叠加进去。设置 ``half_life_days`` 时按比赛日期做指数衰减：
+    每场比赛的权重为 ``0.5 ** (距状态日期的天数 / half_life_days)``。
+
+    ``method="means"`` 直接用场均得失分；``method="ridge"`` 对全部比赛求解带 L2 正则的
+    进攻/防守/主场优势方程组（考虑赛程强度），见 ``solve_ridge``。
+    """
+
+    def __init__(
+        self, half_life_days: float | None = None, method: str = "means", ridge_alpha: float = 10.0
+    ) -> None:
+        if half_life_days is not None and half_life_days <= 0:
+            raise ValueError(f"衰减半衰期必须为正数: {half_life_days}")
+        if method not in FIT_METHODS:
+            raise ValueError(f"未知拟合方式: {method}，可选 {FIT_METHODS}")
+        self.half_life_days = half_life_days
+        self.method = method
+        self.ridge_alpha = ridge_alpha
+
+    def fit(self, results_df: pd.DataFrame, previous_state: pd.DataFrame | None = None) -> TeamTable:
+        return TeamTable.from_state(self.ratings_state(self.fit_state(results_df), results_df, previous_state))
 
+    @staticmethod
+    def _game_days(dates: pd.Series) -> np.ndarray:
+        days = pd.to_datetime(dates, utc=True, errors="coerce").dt.tz_localize(None).dt.normalize()
+        return days.to_numpy()
+
+    @staticmethod
+    def _team_rows(results_df: pd.DataFrame) -> pd.DataFrame:
         home_rows = results_df[["home_team", "home_score", "away_score"]].rename(
             columns={"home_team": "team", "home_score": "points_for", "away_score": "points_against"}
         )
         away_rows = results_df[["away_team", "away_score", "home_score"]].rename(
             columns={"away_team": "team", "away_score": "points_for", "home_score": "points_against"}
         )
-
         team_df = pd.concat([home_rows, away_rows], ignore_index=True)
-        grouped = team_df.groupby("team", as_index=False).agg(
-            points_for=("points_for", "mean"),
-            points_against=("points_against", "mean"),
-            games=("team", "count"),
-        )
-
-        league_avg = grouped["points_for"].mean() if not grouped.empty else 112.0
-        profiles: dict[str, TeamProfile] = {}
-        for _, row in grouped.iterrows():
-            offense = row["points_for"] - league_avg
-            defense = league_avg - row["points_against"]
-            pace = 97 + min(row["games"], 20) * 0.2
-            profiles[row["team"]] = TeamProfile(
-                team=row["team"],
-                offense_rating=float(offense),
-                defense_rating=float(defense),
-                pace=float(pace),
-            )
-
-        return profiles
+        if "game_date_utc" in results_df.columns:
+            team_df["game_day"] = np.tile(TeamStrengthModel._game_days(results_df["game_date_utc"]), 2)
+        else:
+            team_df["game_day"] = pd.NaT
+        return team_df
+
+    def _decay(self, days: np.ndarray) -> np.ndarray:
+        if self.half_life_days is None:
+            return np.ones(len(days))
+        return 0.5 ** (np.nan_to_num(days.astype(float), nan=0.0) / self.half_life_days)
+
+    def _accumulate(self, team_df: pd.DataFrame, as_of: pd.Timestamp | None) -> pd.DataFrame:
+        if as_of is None or pd.isna(as_of):
+            age = np.zeros(len(team_df))
+        else:
+            age = ((as_of - team_df["game_day"]) / pd.Timedelta(days=1)).to_numpy(dtype=float)
+        weight = self._decay(age)
+        frame = pd.DataFrame(
+            {
+                "team": team_df["team"].to_numpy(),
+                "games": 1,
+                "weight": weight,
+                "points_for_sum": team_df["points_for"].to_numpy(dtype=float) * weight,
+                "points_against_sum": team_df["points_against"].to_numpy(dtype=float) * weight,
+            }
+        )
+        return frame.groupby("team", as_index=False).sum()
+
+    def _finish_state(self, acc: pd.DataFrame, as_of: pd.Timestamp | None) -> pd.DataFrame:
+        acc["as_of"] = "" if as_of is None or pd.isna(as_of) else as_of.strftime("%Y-%m-%d")
+        acc["half_life_days"] = np.nan if self.half_life_days is None else float(self.half_life_days)
+        return acc[["team"] + ACCUMULATOR_COLUMNS].reset_index(drop=True)
+
+    def fit_state(self, results_df: pd.DataFrame) -> pd.DataFrame:
+        """从全部历史赛果计算各队累计量（全量重算）。"""
+        if results_df.empty:
+            return pd.DataFrame(columns=["team"] + ACCUMULATOR_COLUMNS)
+        team_df = self._team_rows(results_df)
+        as_of = team_df["game_day"].max()
+        return self._finish_state(self._accumulate(team_df, as_of), as_of)
+
+    def supports_state(self, state_df: pd.DataFrame) -> bool:
+        """模型状态是否含累计量且衰减设置与当前模型一致，可直接增量更新。"""
+        if state_df.empty or not set(ACCUMULATOR_COLUMNS).issubset(state_df.columns):
+            return False
+        stored = pd.to_numeric(state_df["half_life_days"], errors="coerce")
+        if self.half_life_days is None:
+            return bool(stored.isna().all())
+        return bool(np.allclose(stored.to_numpy(dtype=float), self.half_life_days))
+
+    def update_state(self, state_df: pd.DataFrame, new_results: pd.DataFrame) -> pd.DataFrame:
+        """把新完赛的比赛叠加到已有累计量，耗时只与新比赛数量有关。
+
+        ``new_results`` 必须是此前未计入状态的比赛（即 ``save_results`` 返回的新行）。
+        """
+        acc = state_df[["team"] + ACCUMULATOR_COLUMNS].copy()
+        old_as_of = pd.to_datetime(acc["as_of"], errors="coerce").max()
+        if new_results.empty:
+            return self._finish_state(acc.drop(columns=["as_of", "half_life_days"]), old_as_of)
+
+        team_df = self._team_rows(new_results)
+        as_of = pd.Series([old_as_of, team_df["game_day"].max()]).max()
+        if pd.notna(old_as_of) and pd.notna(as_of):
+            scale = self._decay(np.array([(as_of - old_as_of) / pd.Timedelta(days=1)]))[0]
+            acc[["weight", "points_for_sum", "points_against_sum"]] *= scale
+
+        delta = self._accumulate(team_df, as_of)
+        merged = pd.concat([acc.drop(columns=["as_of", "half_life_days"]), delta], ignore_index=True)
+        return self._finish_state(merged.groupby("team", as_index=False).sum(), as_of)
+
+    @staticmethod
+    def model_state(acc: pd.DataFrame, updated_at_bj: str = "") -> pd.DataFrame:
+        """由累计量计算球队评分，生成可直接保存的模型状态表。"""
+        if acc.empty:
+            return pd.DataFrame(columns=MODEL_STATE_COLUMNS)
+        weight = acc["weight"].to_numpy(dtype=float)
+        points_for = acc["points_for_sum"].to_numpy(dtype=float) / weight
+        points_against = acc["points_against_sum"].to_numpy(dtype=float) / weight
+        league_avg = points_for.mean()
+
+        state = acc.copy()
+        state.insert(0, "updated_at_bj", updated_at_bj)
+        state["offense_rating"] = points_for - league_avg
+        state["defense_rating"] = league_avg - points_against
+        state["pace"] = 97 + np.minimum(acc["games"].to_numpy(dtype=float), 20) * 0.2
+        return state[MODEL_STATE_COLUMNS]
+
+    def ratings_state(
+        self,
+        acc: pd.DataFrame,
+        results_df: pd.DataFrame | None = None,
+        previous_state: pd.DataFrame | None = None,
+        updated_at_bj: str = "",
+    ) -> pd.DataFrame:
+        """按拟合方式生成模型状态表；ridge 方式需要全部赛果，并以 ``previous_state`` 热启动。"""
+        state = self.model_state(acc, updated_at_bj)
+        if self.method != "ridge" or state.empty:
+            return state
+        if results_df is None:
+            raise ValueError("ridge 拟合需要全部历史赛果")
+        ratings = self.solve_ridge(results_df, previous_state)
+        state = state.drop(columns=["offense_rating", "defense_rating"]).merge(ratings, on="team", how="left")
+        return state[MODEL_STATE_COLUMNS]
+
+    def solve_ridge(self, results_df: pd.DataFrame, previous_state: pd.DataFrame | None = None) -> pd.DataFrame:
+        """求解 得分 = 联盟均分 + 本队进攻 + 对手失分 + 主场优势 的岭回归。
+
+        每场比赛贡献主、客两行，设计矩阵为稀疏矩阵（每行 3 个非零元），对正规方程
+        ``(XᵀWX + αI)β = XᵀWy`` 用共轭梯度迭代求解，以上一版状态的评分作为初值。
+        输出沿用现有约定：``defense_rating`` 为联盟均分减去失分效应（越大防守越好）。
+        """
+        home = results_df["home_team"].astype(str).to_numpy()
+        away = results_df["away_team"].astype(str).to_numpy()
+        teams, codes = np.unique(np.concatenate([home, away]), return_inverse=True)
+        n_teams, n_games = len(teams), len(results_df)
+        home_code, away_code = codes[:n_games], codes[n_games:]
+
+        # 列: [进攻 0..n) [失分效应 n..2n) [主场优势 2n]
+        rows = np.repeat(np.arange(2 * n_games), 3)
+        cols = np.column_stack(
+            [
+                np.concatenate([home_code, away_code]),
+                n_teams + np.concatenate([away_code, home_code]),
+                np.r_[np.full(n_games, 2 * n_teams), np.full(n_games, -1)],
+            ]
+        ).ravel()
+        keep = cols >= 0
+        design = sparse.csr_matrix(
+            (np.ones(keep.sum()), (rows[keep], cols[keep])), shape=(2 * n_games, 2 * n_teams + 1)
+        )
+
+        scores = np.concatenate(
+            [results_df["home_score"].to_numpy(dtype=float), results_df["away_score"].to_numpy(dtype=float)]
+        )
+        if "game_date_utc" in results_df.columns:
+            days = pd.Series(self._game_days(results_df["game_date_utc"]))
+            age = ((days.max() - days) / pd.Timedelta(days=1)).to_numpy(dtype=float)
+        else:
+            age = np.zeros(n_games)
+        weight = np.tile(self._decay(age), 2)
+        league_avg = np.average(scores, weights=weight)
+
+        weighted = design.multiply(weight[:, None]).tocsr()
+        lhs = (design.T @ weighted + self.ridge_alpha * sparse.identity(2 * n_teams + 1)).tocsr()
+        rhs = weighted.T @ (scores - league_avg)
+
+        x0 = np.zeros(2 * n_teams + 1)
+        if previous_state is not None and not previous_state.empty:
+            prev = previous_state.set_index(previous_state["team"].astype(str))
+            prev = prev.reindex(teams)
+            x0[:n_teams] = prev["offense_rating"].fillna(0.0).to_numpy(dtype=float)
+            x0[n_teams : 2 * n_teams] = -prev["defense_rating"].fillna(0.0).to_numpy(dtype=float)
+
+        beta, info = cg(lhs, rhs, x0=x0, rtol=1e-10, maxiter=1000)
+        if info > 0:
+            LOGGER.warning("ridge 求解 %d 次迭代未收敛", info)
+        return pd.DataFrame(
+            {"team": teams, "offense_rating": beta[:n_teams], "defense_rating": -beta[n_teams : 2 * n_teams]}
+        )
 
     @staticmethod
     def default_profile(team: str) -> TeamProfile:
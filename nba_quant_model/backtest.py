@@ -1,56 +1,105 @@
-"""回测脚本：基于预测历史统计命中率与ROI。"""
+"""回测脚本：基于预测历史统计命中率与ROI，或对历史比赛做滚动回测。"""
 
 from __future__ import annotations
 
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
+from src.data_loader import RAW_FILE
+from src.feature_engineering import build_match_features
+from src.walk_forward import DEFAULT_FOLD_DAYS, WALK_FORWARD_FILE, walk_forward
+
 HISTORY_FILE = "data/prediction_history.csv"
+SETTLE_COLUMNS = ["是否命中让分", "是否命中大小分"]
+SETTLEMENT_FILE = Path("data") / "prediction_settlements.csv"
+SETTLEMENT_KEYS = ["北京时间", "比赛"]
+WIN_PAYOUT = 0.91
+# 优势区间按绝对值划分，首个边界为 predictor 中的建议下注阈值
+SPREAD_EDGE_BINS = [0.0, 1.5, 3.0, 5.0, float("inf")]
+TOTAL_EDGE_BINS = [0.0, 3.0, 6.0, 10.0, float("inf")]
+BOOTSTRAP_ROUNDS = 2000
+CONFIDENCE_LEVEL = 0.95
 
 
 def _settle_hits(df: pd.DataFrame) -> pd.DataFrame:
     """根据实际赛果结算命中结果。"""
     settled = df.copy()
 
-    settled["让分方向"] = (settled["模型预测让分"] - settled["市场让分"]).apply(lambda x: "主队" if x >= 0 else "客队")
-    settled["大小分方向"] = (settled["模型预测总分"] - settled["市场总分"]).apply(lambda x: "大分" if x >= 0 else "小分")
+    pick_home = (settled["模型预测让分"] - settled["市场让分"]).to_numpy() >= 0
+    pick_over = (settled["模型预测总分"] - settled["市场总分"]).to_numpy() >= 0
+    margin, spread_line = settled["实际分差"].to_numpy(), settled["市场让分"].to_numpy()
+    points, total_line = settled["实际总分"].to_numpy(), settled["市场总分"].to_numpy()
 
-    settled["是否命中让分"] = (
-        ((settled["让分方向"] == "主队") & (settled["实际分差"] > settled["市场让分"]))
-        | ((settled["让分方向"] == "客队") & (settled["实际分差"] < settled["市场让分"]))
-    ).map({True: 1, False: 0})
-
-    settled["是否命中大小分"] = (
-        ((settled["大小分方向"] == "大分") & (settled["实际总分"] > settled["市场总分"]))
-        | ((settled["大小分方向"] == "小分") & (settled["实际总分"] < settled["市场总分"]))
-    ).map({True: 1, False: 0})
+    settled["让分方向"] = np.where(pick_home, "主队", "客队")
+    settled["大小分方向"] = np.where(pick_over, "大分", "小分")
+    settled["是否命中让分"] = np.where(pick_home, margin > spread_line, margin < spread_line).astype(int)
+    settled["是否命中大小分"] = np.where(pick_over, points > total_line, points < total_line).astype(int)
 
     return settled
 
 
-def main() -> None:
-    """执行回测统计。"""
-    df = pd.read_csv(HISTORY_FILE)
-    valid_df = df.dropna(subset=["实际分差", "实际总分"]).copy()
-    valid_df = valid_df[(valid_df["实际总分"] > 0) | (valid_df["实际分差"] != 0)]
-
-    if valid_df.empty:
-        print("暂无可回测记录，请等待比赛结束后再运行。")
-        return
-
-    settled = _settle_hits(valid_df)
-
+def bootstrap_intervals(
+    settled: pd.DataFrame,
+    n_boot: int = BOOTSTRAP_ROUNDS,
+    level: float = CONFIDENCE_LEVEL,
+    seed: int | None = 7,
+) -> pd.DataFrame:
+    """按盘口与优势区间计算命中率和ROI的自助法置信区间。
+
+    每注命中为0/1，n 注样本重抽后的命中数服从 Binomial(n, 命中率)，因此所有分组的自助样本
+    由一次 (分组数, n_boot) 的二项抽样得到，无需逐注重抽；ROI = 命中率 × (1 + 赔付) - 1。
+    """
+    groups = []
+    for market, hit_col, edge_col, bins in (
+        ("让分", "是否命中让分", "让分优势", SPREAD_EDGE_BINS),
+        ("大小分", "是否命中大小分", "大小分优势", TOTAL_EDGE_BINS),
+    ):
+        hits = settled[hit_col].to_numpy(dtype=float)
+        bucket = pd.cut(settled[edge_col].abs(), bins, right=False)
+        codes = bucket.cat.codes.to_numpy()
+        known = codes >= 0
+        counts = np.bincount(codes[known], minlength=len(bins) - 1)
+        sums = np.bincount(codes[known], hits[known], len(bins) - 1)
+        groups.append((market, "全部", hits.size, hits.sum()))
+        groups.extend((market, str(label), n, k) for label, n, k in zip(bucket.cat.categories, counts, sums))
+
+    stats = pd.DataFrame(groups, columns=["盘口", "优势区间", "注数", "命中数"])
+    stats = stats[stats["注数"] > 0].reset_index(drop=True)
+    n = stats["注数"].to_numpy()[:, None]
+    rate = (stats["命中数"] / stats["注数"]).to_numpy()
+
+    rng = np.random.default_rng(seed)
+    boot_rate = rng.binomial(n, rate[:, None], size=(len(stats), n_boot)) / n
+    lower, upper = np.quantile(boot_rate, [(1 - level) / 2, (1 + level) / 2], axis=1)
+
+    payout = 1 + WIN_PAYOUT
+    stats["命中率"] = rate
+    stats["命中率下限"] = lower
+    stats["命中率上限"] = upper
+    stats["ROI"] = rate * payout - 1
+    stats["ROI下限"] = lower * payout - 1
+    stats["ROI上限"] = upper * payout - 1
+    return stats.drop(columns=["命中数"])
+
+
+def _print_summary(settled: pd.DataFrame, title: str, n_boot: int = BOOTSTRAP_ROUNDS) -> None:
+    """打印命中率、平均优势与ROI，以及分盘口、分优势区间的置信区间。"""
     total_games = len(settled)
     spread_hit = settled["是否命中让分"].mean()
     total_hit = settled["是否命中大小分"].mean()
     avg_edge = (settled["让分优势"].abs() + settled["大小分优势"].abs()).mean() / 2
 
     # 假设每场投注1单位：让分与大小分各下注1次
-    pnl_spread = settled["是否命中让分"].sum() * 0.91 - (total_games - settled["是否命中让分"].sum())
-    pnl_total = settled["是否命中大小分"].sum() * 0.91 - (total_games - settled["是否命中大小分"].sum())
+    pnl_spread = settled["是否命中让分"].sum() * WIN_PAYOUT - (total_games - settled["是否命中让分"].sum())
+    pnl_total = settled["是否命中大小分"].sum() * WIN_PAYOUT - (total_games - settled["是否命中大小分"].sum())
     total_stake = total_games * 2
     roi = (pnl_spread + pnl_total) / total_stake
 
-    print("NBA量化预测回测结果")
+    print(title)
     print("=" * 30)
     print(f"总预测场数: {total_games}")
     print(f"让分命中率: {spread_hit:.2%}")
@@ -58,8 +107,109 @@ def main() -> None:
     print(f"平均优势: {avg_edge:.2f}")
     print(f"假设每场投注1单位ROI: {roi:.2%}")
 
-    df.update(settled[["是否命中让分", "是否命中大小分"]])
-    df.to_csv(HISTORY_FILE, index=False, encoding="utf-8-sig")
+    if n_boot > 0:
+        intervals = bootstrap_intervals(settled, n_boot=n_boot)
+        pct_cols = ["命中率", "命中率下限", "命中率上限", "ROI", "ROI下限", "ROI上限"]
+        print(f"\n{CONFIDENCE_LEVEL:.0%} 自助法置信区间（{n_boot} 次重抽）")
+        print(intervals.to_string(index=False, formatters={col: "{:.2%}".format for col in pct_cols}))
+
+
+def _load_settlements() -> pd.DataFrame:
+    """读取已结算标记（追加写入的旁路文件）。"""
+    if not SETTLEMENT_FILE.exists():
+        return pd.DataFrame(columns=SETTLEMENT_KEYS + SETTLE_COLUMNS)
+    return pd.read_csv(SETTLEMENT_FILE)
+
+
+def _append_settlements(newly: pd.DataFrame) -> None:
+    """将新结算的比赛追加到旁路文件，不改写预测历史。"""
+    is_new_file = not SETTLEMENT_FILE.exists()
+    SETTLEMENT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    # utf-8-sig 每次打开都会写 BOM，只在新建文件时使用
+    newly[SETTLEMENT_KEYS + SETTLE_COLUMNS].to_csv(
+        SETTLEMENT_FILE,
+        mode="a",
+        header=is_new_file,
+        index=False,
+        encoding="utf-8-sig" if is_new_file else "utf-8",
+    )
+
+
+def run_history_backtest(n_boot: int = BOOTSTRAP_ROUNDS) -> None:
+    """结算预测历史并统计；新结算的比赛按 (北京时间, 比赛) 追加到 prediction_settlements.csv。"""
+    df = pd.read_csv(HISTORY_FILE)
+    valid = df["实际分差"].notna() & df["实际总分"].notna() & ((df["实际总分"] > 0) | (df["实际分差"] != 0))
+
+    if not valid.any():
+        print("暂无可回测记录，请等待比赛结束后再运行。")
+        return
+
+    settled = _settle_hits(df[valid])
+    _print_summary(settled, "NBA量化预测回测结果", n_boot)
+
+    # 旧版本直接写在预测历史中的标记同样视为已结算
+    known = _load_settlements()
+    known_keys = pd.MultiIndex.from_frame(known[SETTLEMENT_KEYS].astype(str))
+    settled_keys = pd.MultiIndex.from_frame(settled[SETTLEMENT_KEYS].astype(str))
+    already = settled_keys.isin(known_keys) | settled[SETTLE_COLUMNS].notna().all(axis=1).to_numpy() & False
+    already |= df.loc[valid, SETTLE_COLUMNS].notna().all(axis=1).to_numpy()
+    newly = settled[~already].drop_duplicates(subset=SETTLEMENT_KEYS, keep="last")
+    if newly.empty:
+        return
+    _append_settlements(newly)
+    print(f"\n新结算 {len(newly)} 场，已追加至 {SETTLEMENT_FILE}")
+
+
+def run_walk_forward_backtest(args: argparse.Namespace) -> None:
+    """基于原始比赛数据做滚动回测，结果写入 walk_forward_history.csv。"""
+    raw_df = pd.read_csv(args.raw_file)
+    features_df = build_match_features(raw_df)
+    market_lines = pd.read_csv(args.market_file) if args.market_file else None
+
+    began = time.perf_counter()
+    result = walk_forward(
+        features_df,
+        start=args.start,
+        end=args.end,
+        fold_days=args.fold_days,
+        workers=args.workers,
+        daily_update=not args.no_daily_update,
+        market_lines=market_lines,
+    )
+    elapsed = time.perf_counter() - began
+
+    settled = _settle_hits(result)
+    WALK_FORWARD_FILE.parent.mkdir(parents=True, exist_ok=True)
+    settled.to_csv(WALK_FORWARD_FILE, index=False, encoding="utf-8-sig")
+
+    print(f"回测区间: {result['北京日期'].min()} 至 {result['北京日期'].max()}，耗时 {elapsed:.1f} 秒")
+    print(f"使用市场盘口的比赛: {(result['盘口来源'] == '市场').sum()} 场，其余使用基线盘口")
+    _print_summary(settled, "NBA量化模型滚动回测结果", args.bootstrap)
+    print(f"逐场结果已保存至 {WALK_FORWARD_FILE}")
+
+
+def main() -> None:
+    """执行回测统计。"""
+    parser = argparse.ArgumentParser(description="回测命中率与ROI")
+    parser.add_argument("--walk-forward", action="store_true", help="对原始比赛数据逐日重放训练与预测")
+    parser.add_argument("--raw-file", default=str(RAW_FILE), help="原始比赛数据（可包含多个赛季）")
+    parser.add_argument("--start", help="回测起始北京日期 YYYY-MM-DD，默认最近一个赛季首日")
+    parser.add_argument("--end", help="回测结束北京日期 YYYY-MM-DD，默认最后一个比赛日")
+    parser.add_argument("--fold-days", type=int, default=DEFAULT_FOLD_DAYS, help="每折比赛日数，每折从零训练一次")
+    parser.add_argument("--workers", type=int, default=None, help="并行进程数，默认CPU核数")
+    parser.add_argument("--no-daily-update", action="store_true", help="折内不做逐日增量训练")
+    parser.add_argument(
+        "--market-file", help="历史盘口CSV：比赛ID（或北京日期+比赛）、市场让分、市场总分；缺失时使用基线盘口"
+    )
+    parser.add_argument(
+        "--bootstrap", type=int, default=BOOTSTRAP_ROUNDS, help="置信区间的自助法重抽次数，0 表示不计算"
+    )
+    args = parser.parse_args()
+
+    if args.walk_forward:
+        run_walk_forward_backtest(args)
+    else:
+        run_history_backtest(args.bootstrap)
 
 
 if __name__ == "__main__":
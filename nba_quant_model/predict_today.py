@@ -5,8 +5,8 @@ from __future__ import annotations
 import os
 import pandas as pd
 
-from src.feature_engineering import build_match_features
 from src.data_loader import load_games_raw
+from src.feature_cache import load_or_build_features
 from src.predictor import predict_today
 
 
@@ -16,7 +16,7 @@ def main() -> None:
         raise FileNotFoundError("未找到模型文件，请先运行 train.py")
 
     raw_df = load_games_raw()
-    feat_df = build_match_features(raw_df)
+    feat_df = load_or_build_features(raw_df)
     pred_df = predict_today(feat_df)
 
     if pred_df.empty:
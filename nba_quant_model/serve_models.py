@@ -0,0 +1,20 @@
+"""模型服务入口脚本：常驻加载模型，供机器人与批处理任务经本地HTTP请求预测。"""
+
+from __future__ import annotations
+
+import argparse
+
+from src.serving import DEFAULT_HOST, DEFAULT_PORT, serve
+
+
+def main() -> None:
+    """解析参数并启动本地模型服务。"""
+    parser = argparse.ArgumentParser(description="本地模型服务")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    serve(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,8 @@ from __future__ import annotations
 from pathlib import Path
 import pandas as pd
 
-from nba_api.stats.endpoints import leaguegamelog
-
-from src.time_utils import convert_us_to_utc_and_beijing
+from src.stats_api import fetch_league_game_log
+from src.time_utils import convert_us_series_to_utc_and_beijing
 
 
 DATA_DIR = Path("data")
@@ -45,32 +44,27 @@ RENAME_MAP = {
 }
 
 
-def _to_us_eastern_str(game_date_str: str) -> str:
-    """将NBA日期字符串转为美国东部时间字符串（默认中午12点，避免日期跨日歧义）。"""
-    date_value = pd.to_datetime(game_date_str).strftime("%Y-%m-%d")
-    return f"{date_value} 12:00:00"
+def _to_us_eastern_str(game_dates: pd.Series) -> pd.Series:
+    """将NBA日期列转为美国东部时间字符串列（默认中午12点，避免日期跨日歧义）。"""
+    return pd.to_datetime(game_dates).dt.strftime("%Y-%m-%d") + " 12:00:00"
 
 
 def download_games_history(season: str = "2024-25", season_type: str = "Regular Season") -> pd.DataFrame:
     """下载NBA历史比赛数据并保存至CSV。"""
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    endpoint = leaguegamelog.LeagueGameLog(
-        season=season,
-        season_type_all_star=season_type,
-        player_or_team_abbreviation="T",
-    )
-    df = endpoint.get_data_frames()[0].copy()
+    df = fetch_league_game_log(season, season_type).copy()
 
     df = df.rename(columns={k: v for k, v in RENAME_MAP.items() if k in df.columns})
 
-    time_rows = df["比赛日期"].apply(_to_us_eastern_str).apply(convert_us_to_utc_and_beijing)
-    df["UTC时间"] = time_rows.apply(lambda x: x["utc_time"])
-    df["北京时间"] = time_rows.apply(lambda x: x["bj_time_str"])
-    df["北京日期"] = time_rows.apply(lambda x: x["bj_date"])
+    time_cols = convert_us_series_to_utc_and_beijing(_to_us_eastern_str(df["比赛日期"]))
+    df["UTC时间"] = time_cols["utc_time"]
+    df["北京时间"] = time_cols["bj_time_str"]
+    df["北京日期"] = time_cols["bj_date"]
 
     df.to_csv(RAW_FILE, index=False, encoding="utf-8-sig")
-    return df
+    # 返回从CSV读回的数据，训练与预测拿到的字段类型一致，特征缓存才能按内容命中
+    return pd.read_csv(RAW_FILE)
 
 
 def load_games_raw() -> pd.DataFrame:
@@ -0,0 +1,73 @@
+"""特征缓存模块：按原始数据内容与特征代码版本缓存比赛粒度特征。"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+from src.feature_engineering import ELO_STATE_DIR, FEATURE_VERSION, TEAM_STORE_DIR, build_match_features
+
+
+FEATURE_CACHE_DIR = Path("data") / "feature_cache"
+VERSION_FILE = "version.json"
+KEEP_ENTRIES = 3
+
+
+def raw_data_hash(df_raw: pd.DataFrame) -> str:
+    """计算原始数据（列名、行内容与行顺序）与特征版本的内容哈希。"""
+    digest = hashlib.sha256()
+    digest.update(FEATURE_VERSION.encode("utf-8"))
+    digest.update(json.dumps([str(c) for c in df_raw.columns], ensure_ascii=False).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df_raw, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:32]
+
+
+def _reset_stale_state(cache_dir: Path, state_dirs: list[Path]) -> None:
+    """特征版本变化时清空旧缓存与ELO/球队特征增量状态。"""
+    version_file = cache_dir / VERSION_FILE
+    if version_file.exists():
+        with version_file.open(encoding="utf-8") as fh:
+            if json.load(fh).get("feature_version") == FEATURE_VERSION:
+                return
+    for path in [*cache_dir.glob("features_*.pkl"), *state_dirs]:
+        if path.is_dir():
+            shutil.rmtree(path)
+        elif path.exists():
+            path.unlink()
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with version_file.open("w", encoding="utf-8") as fh:
+        json.dump({"feature_version": FEATURE_VERSION}, fh)
+
+
+def _prune(cache_dir: Path) -> None:
+    """只保留最近写入的若干个缓存文件。"""
+    entries = sorted(cache_dir.glob("features_*.pkl"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in entries[KEEP_ENTRIES:]:
+        path.unlink()
+
+
+def load_or_build_features(
+    df_raw: pd.DataFrame,
+    cache_dir: str | Path = FEATURE_CACHE_DIR,
+    elo_state_dir: str | Path = ELO_STATE_DIR,
+    team_store_dir: str | Path = TEAM_STORE_DIR,
+) -> pd.DataFrame:
+    """命中缓存时直接读取特征；未命中时借助ELO断点与球队特征库只处理新增的原始行。"""
+    cache_dir = Path(cache_dir)
+    _reset_stale_state(cache_dir, [Path(elo_state_dir), Path(team_store_dir)])
+
+    path = cache_dir / f"features_{raw_data_hash(df_raw)}.pkl"
+    if path.exists():
+        return pd.read_pickle(path)
+
+    features_df = build_match_features(df_raw, elo_state_dir=elo_state_dir, team_store_dir=team_store_dir)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    features_df.to_pickle(tmp)
+    os.replace(tmp, path)
+    _prune(cache_dir)
+    return features_df
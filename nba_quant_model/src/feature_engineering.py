@@ -2,24 +2,46 @@
 
 from __future__ import annotations
 
+import json
+import os
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
 
 
+# 特征计算逻辑变化时递增，使特征缓存与增量状态失效
+FEATURE_VERSION = "1"
+
 INITIAL_ELO = 1500.0
 HOME_ADVANTAGE_ELO = 60.0
 K_FACTOR = 20.0
-
-
-def _is_home(matchup: str) -> int:
+ELO_STATE_DIR = Path("data") / "elo_state"
+ELO_STATE_FILE = "elo_state.json"
+ELO_HISTORY_FILE = "elo_history.pkl"
+ELO_ORDER = ["比赛日期", "比赛ID", "球队"]
+TEAM_STORE_DIR = Path("data") / "feature_store"
+TEAM_STORE_FILE = "team_features.pkl"
+TEAM_KEYS = ["比赛ID", "球队"]
+ROLLING_WINDOW = 10
+ROLLING_MIN_PERIODS = 3
+ROLLING_FEATURES = {
+    "得分": "最近10场均分",
+    "正负值": "最近10场净胜分",
+    "进攻效率": "进攻效率_近10",
+    "回合数": "Pace",
+}
+
+
+def _is_home(matchup: pd.Series) -> pd.Series:
     """判断是否主场。"""
-    return 1 if " vs. " in str(matchup) else 0
+    return matchup.astype(str).str.contains(" vs. ", regex=False).astype(int)
 
 
-def _opponent_team(matchup: str) -> str:
+def _opponent_team(matchup: pd.Series) -> pd.Series:
     """从对阵字段提取对手简称。"""
-    parts = str(matchup).replace(" vs. ", " @ ").split(" @ ")
-    return parts[1].strip() if len(parts) == 2 else ""
+    parts = matchup.astype(str).str.replace(" vs. ", " @ ", regex=False).str.split(" @ ", regex=False)
+    return parts.str[1].str.strip().where(parts.str.len() == 2, "")
 
 
 def _calc_possessions(df: pd.DataFrame) -> pd.Series:
@@ -27,95 +49,219 @@ def _calc_possessions(df: pd.DataFrame) -> pd.Series:
     return df["投篮出手"] + 0.44 * df["罚球出手"] - df["前场篮板"] + df["失误"]
 
 
-def add_team_level_features(df_raw: pd.DataFrame) -> pd.DataFrame:
-    """在球队比赛粒度下增加滚动与体能特征。"""
+def _prepare_team_rows(df_raw: pd.DataFrame) -> pd.DataFrame:
+    """逐行可独立计算的字段：主客场、对手、回合数与进攻效率。"""
     df = df_raw.copy()
     df["比赛日期"] = pd.to_datetime(df["比赛日期"])
-    df = df.sort_values(["球队", "比赛日期"])
-
-    df["是否主场"] = df["对阵"].apply(_is_home)
-    df["对手"] = df["对阵"].apply(_opponent_team)
+    df["是否主场"] = _is_home(df["对阵"])
+    df["对手"] = _opponent_team(df["对阵"])
     df["回合数"] = _calc_possessions(df).replace(0, np.nan)
     df["进攻效率"] = df["得分"] / df["回合数"] * 100
+    return df
 
-    grouped = df.groupby("球队", group_keys=False)
-    df["最近10场均分"] = grouped["得分"].apply(lambda s: s.shift(1).rolling(10, min_periods=3).mean())
-    df["最近10场净胜分"] = grouped["正负值"].apply(lambda s: s.shift(1).rolling(10, min_periods=3).mean())
-    df["最近10场状态"] = (df["最近10场净胜分"] > 0).astype(int)
-    df["进攻效率_近10"] = grouped["进攻效率"].apply(lambda s: s.shift(1).rolling(10, min_periods=3).mean())
-    df["Pace"] = grouped["回合数"].apply(lambda s: s.shift(1).rolling(10, min_periods=3).mean())
+
+def _add_rolling_features(df: pd.DataFrame) -> pd.DataFrame:
+    """对按球队、日期排序的数据一次性计算各队赛前滚动与体能特征。"""
+    df = df.sort_values(["球队", "比赛日期"])
+    grouped = df.groupby("球队", sort=False)
+    shifted = grouped[list(ROLLING_FEATURES)].shift(1)
+    rolled = (
+        shifted.groupby(df["球队"], sort=False)
+        .rolling(ROLLING_WINDOW, min_periods=ROLLING_MIN_PERIODS)
+        .mean()
+    )
+    # 数据已按球队连续排列，按首次出现顺序分组后的结果与 df 行顺序一致
+    for source, target in ROLLING_FEATURES.items():
+        df[target] = rolled[source].to_numpy()
+        if target == "最近10场净胜分":
+            df["最近10场状态"] = (df["最近10场净胜分"] > 0).astype(int)
 
     prev_date = grouped["比赛日期"].shift(1)
     df["休息天数"] = (df["比赛日期"] - prev_date).dt.days.fillna(5).clip(lower=0)
     df["是否背靠背"] = (df["休息天数"] <= 1).astype(int)
-
     return df
 
 
-def add_dynamic_elo(df_team: pd.DataFrame) -> pd.DataFrame:
-    """按比赛顺序计算动态ELO。"""
-    df = df_team.copy().sort_values(["比赛日期", "比赛ID", "球队"])
-
-    elo_map: dict[str, float] = {}
-    pre_elo_values = []
-
-    for _, row in df.iterrows():
-        team = row["球队"]
-        opp = row["对手"]
-        team_elo = elo_map.get(team, INITIAL_ELO)
-        opp_elo = elo_map.get(opp, INITIAL_ELO)
-
-        pre_elo_values.append(team_elo)
-
-        home_bonus = HOME_ADVANTAGE_ELO if row["是否主场"] == 1 else -HOME_ADVANTAGE_ELO
+def _row_keys(df: pd.DataFrame) -> pd.MultiIndex:
+    return pd.MultiIndex.from_arrays([df[col].astype(str) for col in TEAM_KEYS])
+
+
+def _extend_team_features(stored: pd.DataFrame, df_raw: pd.DataFrame) -> pd.DataFrame | None:
+    """在已保存的球队特征上追加新比赛，只重算新比赛所在的滚动窗口。
+
+    已保存的行不再全部出现在原始数据中，或新比赛早于该队已保存的最后一场时返回 None。
+    """
+    stored_keys = _row_keys(stored)
+    if not stored_keys.isin(_row_keys(df_raw)).all():
+        return None
+    new = _prepare_team_rows(df_raw[~_row_keys(df_raw).isin(stored_keys)])
+    if new.empty:
+        return stored
+
+    last_date = stored.groupby("球队")["比赛日期"].max()
+    first_new = new.groupby("球队")["比赛日期"].min()
+    overlap = first_new.index.intersection(last_date.index)
+    if (first_new[overlap] <= last_date[overlap]).any():
+        return None
+
+    context = stored[stored["球队"].isin(first_new.index)].sort_values("比赛日期").groupby("球队").tail(ROLLING_WINDOW)
+    combined = _add_rolling_features(
+        pd.concat([context.assign(_新增=False), new.assign(_新增=True)], ignore_index=True)
+    )
+    fresh = combined[combined["_新增"]].drop(columns="_新增")
+    return pd.concat([stored, fresh], ignore_index=True)
+
+
+def add_team_level_features(df_raw: pd.DataFrame, store_dir: str | Path | None = None) -> pd.DataFrame:
+    """在球队比赛粒度下增加滚动与体能特征。
+
+    指定 ``store_dir`` 时把各队特征保存为球队特征库；下次运行只为新增比赛计算特征
+    （每队取已保存的最近 ``ROLLING_WINDOW`` 场作为窗口上下文），历史数据被改动时全量重算。
+    """
+    if store_dir is None:
+        return _add_rolling_features(_prepare_team_rows(df_raw))
+
+    store_file = Path(store_dir) / TEAM_STORE_FILE
+    df = None
+    if store_file.exists():
+        df = _extend_team_features(pd.read_pickle(store_file), df_raw)
+    if df is None:
+        df = _add_rolling_features(_prepare_team_rows(df_raw)).reset_index(drop=True)
+
+    store_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = store_file.with_suffix(".tmp")
+    df.to_pickle(tmp)
+    os.replace(tmp, store_file)
+    return df.sort_values(["球队", "比赛日期"])
+
+
+def _elo_pass(
+    team_codes: list[int], opp_codes: list[int], is_home: list[bool], wins: list[float], ratings: list[float]
+) -> list[float]:
+    """按行顺序更新ELO，返回每行赛前ELO；每行只更新本队，对手取其当前ELO。"""
+    pre_elo = []
+    for team, opp, home, actual in zip(team_codes, opp_codes, is_home, wins):
+        team_elo = ratings[team]
+        opp_elo = ratings[opp]
+        pre_elo.append(team_elo)
+
+        home_bonus = HOME_ADVANTAGE_ELO if home else -HOME_ADVANTAGE_ELO
         expected = 1 / (1 + 10 ** (-(team_elo + home_bonus - opp_elo) / 400))
-        actual = 1.0 if row.get("胜负", "L") == "W" else 0.0
-
-        new_team_elo = team_elo + K_FACTOR * (actual - expected)
-        elo_map[team] = new_team_elo
-
-    df["动态ELO"] = pre_elo_values
+        ratings[team] = team_elo + K_FACTOR * (actual - expected)
+    return pre_elo
+
+
+def _load_elo_state(state_dir: Path) -> tuple[dict[str, float], pd.DataFrame] | None:
+    """读取上次运行结束时的ELO表与逐行赛前ELO。"""
+    state_file = state_dir / ELO_STATE_FILE
+    history_file = state_dir / ELO_HISTORY_FILE
+    if not (state_file.exists() and history_file.exists()):
+        return None
+    with state_file.open(encoding="utf-8") as fh:
+        state = json.load(fh)
+    return state["elo"], pd.read_pickle(history_file)
+
+
+def _save_elo_state(state_dir: Path, elo_map: dict[str, float], history: pd.DataFrame) -> None:
+    """保存ELO表、最后处理的比赛ID与逐行赛前ELO。"""
+    state_dir.mkdir(parents=True, exist_ok=True)
+    last_game_id = str(history["比赛ID"].iloc[-1]) if not history.empty else None
+    tmp = state_dir / f"{ELO_STATE_FILE}.tmp"
+    with tmp.open("w", encoding="utf-8") as fh:
+        json.dump({"elo": elo_map, "last_game_id": last_game_id, "rows": len(history)}, fh, ensure_ascii=False)
+    history.to_pickle(state_dir / ELO_HISTORY_FILE)
+    os.replace(tmp, state_dir / ELO_STATE_FILE)
+
+
+def add_dynamic_elo(df_team: pd.DataFrame, state_dir: str | Path | None = None) -> pd.DataFrame:
+    """按比赛顺序计算动态ELO。
+
+    指定 ``state_dir`` 时保存本次结束时的ELO表与逐行赛前ELO；下次运行若已处理的行
+    仍是排序后数据的前缀，则直接复用并只从断点继续计算新增行。
+    """
+    df = df_team.copy().sort_values(ELO_ORDER)
+
+    teams = df["球队"].astype(str).to_numpy()
+    opps = df["对手"].astype(str).to_numpy()
+    codes, names = pd.factorize(np.concatenate([teams, opps]), use_na_sentinel=False)
+    team_codes, opp_codes = codes[: len(df)], codes[len(df) :]
+    is_home = (df["是否主场"] == 1).to_numpy()
+    results = df["胜负"] if "胜负" in df.columns else pd.Series("L", index=df.index)
+    wins = np.where(results.to_numpy() == "W", 1.0, 0.0)
+
+    ratings = [INITIAL_ELO] * len(names)
+    start = 0
+    pre_elo: list[float] = []
+    saved = _load_elo_state(Path(state_dir)) if state_dir is not None else None
+    if saved is not None:
+        elo_map, history = saved
+        n_done = len(history)
+        if 0 < n_done <= len(df) and (
+            np.array_equal(history["比赛ID"].astype(str).to_numpy(), df["比赛ID"].astype(str).to_numpy()[:n_done])
+            and np.array_equal(history["球队"].astype(str).to_numpy(), teams[:n_done])
+        ):
+            start = n_done
+            pre_elo = history["动态ELO"].tolist()
+            ratings = [elo_map.get(name, INITIAL_ELO) for name in names]
+
+    pre_elo += _elo_pass(
+        team_codes[start:].tolist(),
+        opp_codes[start:].tolist(),
+        is_home[start:].tolist(),
+        wins[start:].tolist(),
+        ratings,
+    )
+    df["动态ELO"] = pre_elo
+
+    if state_dir is not None:
+        elo_map = dict(zip(names, ratings))
+        history = pd.DataFrame({"比赛ID": df["比赛ID"].astype(str).to_numpy(), "球队": teams, "动态ELO": pre_elo})
+        _save_elo_state(Path(state_dir), elo_map, history)
     return df
 
 
-def build_match_features(df_raw: pd.DataFrame) -> pd.DataFrame:
-    """将球队粒度数据聚合为比赛粒度特征。"""
-    team_df = add_dynamic_elo(add_team_level_features(df_raw))
-    team_df = team_df.sort_values(["比赛ID", "是否主场"], ascending=[True, False])
-
-    rows = []
-    for game_id, g in team_df.groupby("比赛ID"):
-        if len(g) != 2:
-            continue
-        home = g[g["是否主场"] == 1]
-        away = g[g["是否主场"] == 0]
-        if home.empty or away.empty:
-            continue
-
-        h = home.iloc[0]
-        a = away.iloc[0]
-
-        row = {
-            "比赛ID": game_id,
-            "北京日期": h["北京日期"],
-            "北京时间": h["北京时间"],
-            "主队": h["球队"],
-            "客队": a["球队"],
-            "比赛": f"{a['球队']} vs {h['球队']}",
-            "动态ELO差": h["动态ELO"] - a["动态ELO"],
-            "最近10场状态差": h["最近10场状态"] - a["最近10场状态"],
-            "进攻效率差": h["进攻效率_近10"] - a["进攻效率_近10"],
-            "防守效率差": a["进攻效率_近10"] - h["进攻效率_近10"],
-            "Pace均值": np.nanmean([h["Pace"], a["Pace"]]),
+def assemble_match_rows(team_df: pd.DataFrame) -> pd.DataFrame:
+    """把球队粒度行按比赛ID拆成主、客两半后拼接为比赛粒度特征（未填补缺失值）。
+
+    只保留恰好两行且一主一客的比赛：先过滤行数不为 2 的比赛，再按比赛ID内连接主、客两半，
+    双主或双客的比赛在连接中自然被剔除。结果按比赛ID升序。
+    """
+    sizes = team_df.groupby("比赛ID")["比赛ID"].transform("size")
+    paired = team_df[sizes == 2]
+    h = paired[paired["是否主场"] == 1]
+    a = paired[paired["是否主场"] == 0]
+    m = h.merge(a, on="比赛ID", how="inner", suffixes=("_h", "_a"), sort=True)
+
+    return pd.DataFrame(
+        {
+            "比赛ID": m["比赛ID"],
+            "北京日期": m["北京日期_h"],
+            "北京时间": m["北京时间_h"],
+            "主队": m["球队_h"],
+            "客队": m["球队_a"],
+            "比赛": m["球队_a"].astype(str) + " vs " + m["球队_h"].astype(str),
+            "动态ELO差": m["动态ELO_h"] - m["动态ELO_a"],
+            "最近10场状态差": m["最近10场状态_h"] - m["最近10场状态_a"],
+            "进攻效率差": m["进攻效率_近10_h"] - m["进攻效率_近10_a"],
+            "防守效率差": m["进攻效率_近10_a"] - m["进攻效率_近10_h"],
+            "Pace均值": m[["Pace_h", "Pace_a"]].mean(axis=1),
             "主场优势": 1,
-            "休息天数差": h["休息天数"] - a["休息天数"],
-            "背靠背差": h["是否背靠背"] - a["是否背靠背"],
-            "实际分差": h["得分"] - a["得分"],
-            "实际总分": h["得分"] + a["得分"],
+            "休息天数差": m["休息天数_h"] - m["休息天数_a"],
+            "背靠背差": m["是否背靠背_h"] - m["是否背靠背_a"],
+            "实际分差": m["得分_h"] - m["得分_a"],
+            "实际总分": m["得分_h"] + m["得分_a"],
         }
-        rows.append(row)
+    )
+
 
-    features_df = pd.DataFrame(rows)
+def build_match_features(
+    df_raw: pd.DataFrame,
+    elo_state_dir: str | Path | None = None,
+    team_store_dir: str | Path | None = None,
+) -> pd.DataFrame:
+    """将球队粒度数据聚合为比赛粒度特征；两个目录参数分别见 ``add_dynamic_elo`` 与 ``add_team_level_features``。"""
+    team_df = add_dynamic_elo(add_team_level_features(df_raw, store_dir=team_store_dir), state_dir=elo_state_dir)
+    features_df = assemble_match_rows(team_df)
     numeric_cols = [
         "动态ELO差",
         "最近10场状态差",
@@ -2,54 +2,181 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 import joblib
+import numpy as np
 import pandas as pd
+import xgboost
 from xgboost import XGBRegressor
 
 from src.feature_engineering import feature_columns
+from src.time_utils import BEIJING_ZONE
 
 
 MODELS_DIR = Path("models")
 SPREAD_MODEL_FILE = MODELS_DIR / "spread_model.joblib"
 TOTAL_MODEL_FILE = MODELS_DIR / "total_model.joblib"
+MODEL_META_FILE = MODELS_DIR / "model_meta.json"
+TRAINED_GAMES_FILE = MODELS_DIR / "trained_games.json"
 
+TRAIN_MODES = ("full", "auto")
+BASE_ROUNDS = 300
+INCREMENTAL_ROUNDS = 50
+MAX_TREES = 1000
 
-def train_models(features_df: pd.DataFrame) -> tuple[XGBRegressor, XGBRegressor]:
-    """训练让分与总分模型。"""
-    MODELS_DIR.mkdir(parents=True, exist_ok=True)
 
-    cols = feature_columns()
-    train_df = features_df.dropna(subset=["实际分差", "实际总分"]).copy()
+def file_digest(path: Path) -> str:
+    """计算模型文件的SHA-256。"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_model_meta(**extra) -> dict:
+    """写入训练产物元数据：模型版本、文件摘要与特征列，供模型服务校验。"""
+    spread_sha = file_digest(SPREAD_MODEL_FILE)
+    total_sha = file_digest(TOTAL_MODEL_FILE)
+    meta = {
+        "model_version": hashlib.sha256((spread_sha + total_sha).encode("ascii")).hexdigest()[:16],
+        "spread_sha256": spread_sha,
+        "total_sha256": total_sha,
+        "feature_columns": feature_columns(),
+        "xgboost_version": xgboost.__version__,
+        "trained_at": datetime.now(BEIJING_ZONE).strftime("%Y-%m-%d %H:%M:%S"),
+        **extra,
+    }
+    with open(MODEL_META_FILE, "w", encoding="utf-8") as fh:
+        json.dump(meta, fh, ensure_ascii=False, indent=2)
+    return meta
+
+
+def read_model_meta() -> dict | None:
+    """读取训练产物元数据，不存在时返回 None。"""
+    if not MODEL_META_FILE.exists():
+        return None
+    with open(MODEL_META_FILE, encoding="utf-8") as fh:
+        return json.load(fh)
+
 
-    x_train = train_df[cols]
-    y_spread = train_df["实际分差"]
-    y_total = train_df["实际总分"]
+def features_hash(train_df: pd.DataFrame) -> str:
+    """训练样本（比赛ID、特征列与标签）按比赛ID排序后的内容哈希。"""
+    cols = ["比赛ID", *feature_columns(), "实际分差", "实际总分"]
+    rows = train_df[cols].astype({"比赛ID": str}).sort_values("比赛ID", kind="mergesort")
+    values = pd.util.hash_pandas_object(rows, index=False)
+    return hashlib.sha256(values.to_numpy().tobytes()).hexdigest()[:32]
 
-    spread_model = XGBRegressor(
-        n_estimators=300,
+
+def _new_regressor(n_estimators: int, n_jobs: int) -> XGBRegressor:
+    """构建统一超参数的回归器。"""
+    return XGBRegressor(
+        n_estimators=n_estimators,
         max_depth=4,
         learning_rate=0.05,
         subsample=0.9,
         colsample_bytree=0.9,
         objective="reg:squarederror",
+        tree_method="hist",
+        n_jobs=n_jobs,
         random_state=42,
     )
-    total_model = XGBRegressor(
-        n_estimators=300,
-        max_depth=4,
-        learning_rate=0.05,
-        subsample=0.9,
-        colsample_bytree=0.9,
-        objective="reg:squarederror",
-        random_state=42,
+
+
+def fit_model_pair(
+    x_train: pd.DataFrame | np.ndarray,
+    y_spread: pd.Series | np.ndarray,
+    y_total: pd.Series | np.ndarray,
+    n_estimators: int,
+    base_models: tuple[XGBRegressor, XGBRegressor] | None = None,
+    n_jobs: int | None = None,
+) -> tuple[XGBRegressor, XGBRegressor]:
+    """两个线程并行训练让分与总分模型，各分一半线程（默认全部CPU）；给定 base_models 时在其基础上继续提升。"""
+    n_jobs = max(1, (n_jobs or os.cpu_count() or 2) // 2)
+    bases = base_models or (None, None)
+
+    def fit(y: pd.Series | np.ndarray, base: XGBRegressor | None) -> XGBRegressor:
+        model = _new_regressor(n_estimators, n_jobs)
+        model.fit(x_train, y, xgb_model=None if base is None else base.get_booster())
+        return model
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        spread_future = pool.submit(fit, y_spread, bases[0])
+        total_future = pool.submit(fit, y_total, bases[1])
+        return spread_future.result(), total_future.result()
+
+
+def _load_trained_games() -> set[str]:
+    """读取已参与训练的比赛ID。"""
+    if not TRAINED_GAMES_FILE.exists():
+        return set()
+    with open(TRAINED_GAMES_FILE, encoding="utf-8") as fh:
+        return set(json.load(fh))
+
+
+def train_models(features_df: pd.DataFrame, mode: str = "full") -> tuple[XGBRegressor, XGBRegressor]:
+    """训练让分与总分模型。
+
+    ``mode="full"`` 从零训练 ``BASE_ROUNDS`` 棵树；``mode="auto"`` 在训练样本哈希未变时跳过训练，
+    已训练比赛仍在样本中且其特征与标签（按 ``feature_hash`` 校验）均未变化时，只用新完赛的比赛继续提升
+    ``INCREMENTAL_ROUNDS`` 棵树；其余情况（首次训练、历史样本变化、树数超过 ``MAX_TREES``）退回全量训练。
+    """
+    if mode not in TRAIN_MODES:
+        raise ValueError(f"未知训练模式: {mode}，可选 {TRAIN_MODES}")
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+
+    cols = feature_columns()
+    train_df = features_df.dropna(subset=["实际分差", "实际总分"]).copy()
+    sample_hash = features_hash(train_df)
+    game_ids = train_df["比赛ID"].astype(str)
+
+    meta = read_model_meta()
+    has_models = meta is not None and SPREAD_MODEL_FILE.exists() and TOTAL_MODEL_FILE.exists()
+    if mode == "auto" and has_models and meta.get("feature_hash") == sample_hash:
+        print("训练样本未变化，跳过训练")
+        return load_models()
+
+    trained = _load_trained_games()
+    new_rows = ~game_ids.isin(trained)
+    # 中位数填充、滚动与ELO特征按全量历史重算，已训练比赛的行也可能变化，此时不能在旧模型上叠加
+    trained_unchanged = has_models and features_hash(train_df[~new_rows]) == meta.get("feature_hash")
+    n_trees = int(meta.get("n_trees", BASE_ROUNDS)) if has_models else 0
+    can_extend = (
+        mode == "auto"
+        and has_models
+        and meta.get("feature_columns") == cols
+        and bool(trained)
+        and trained.issubset(set(game_ids))
+        and trained_unchanged
+        and new_rows.any()
+        and n_trees + INCREMENTAL_ROUNDS <= MAX_TREES
     )
 
-    spread_model.fit(x_train, y_spread)
-    total_model.fit(x_train, y_total)
+    if can_extend:
+        print(f"在已有模型上用 {int(new_rows.sum())} 场新比赛继续提升 {INCREMENTAL_ROUNDS} 棵树")
+        fit_df = train_df[new_rows]
+        spread_model, total_model = fit_model_pair(
+            fit_df[cols], fit_df["实际分差"], fit_df["实际总分"], INCREMENTAL_ROUNDS, load_models()
+        )
+        n_trees += INCREMENTAL_ROUNDS
+        train_mode = "incremental"
+    else:
+        spread_model, total_model = fit_model_pair(
+            train_df[cols], train_df["实际分差"], train_df["实际总分"], BASE_ROUNDS
+        )
+        n_trees = BASE_ROUNDS
+        train_mode = "full"
 
     joblib.dump(spread_model, SPREAD_MODEL_FILE)
     joblib.dump(total_model, TOTAL_MODEL_FILE)
+    with open(TRAINED_GAMES_FILE, "w", encoding="utf-8") as fh:
+        json.dump(sorted(set(game_ids)), fh)
+    write_model_meta(feature_hash=sample_hash, n_trees=n_trees, train_mode=train_mode)
 
     return spread_model, total_model
 
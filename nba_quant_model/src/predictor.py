@@ -2,69 +2,79 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
+import numpy as np
 import pandas as pd
-from nba_api.stats.endpoints import scoreboardv2
 
 from src.feature_engineering import build_match_features, feature_columns
-from src.modeling import load_models
-from src.time_utils import BEIJING_ZONE, convert_to_beijing_time, now_beijing_date_str
+from src.serving import get_server
+from src.stats_api import fetch_scoreboard
+from src.time_utils import BEIJING_ZONE, convert_us_series_to_utc_and_beijing, now_beijing_date_str
 
 
 DATA_DIR = Path("data")
 HISTORY_FILE = DATA_DIR / "prediction_history.csv"
 MARKET_FILE = DATA_DIR / "market_lines_today.csv"
+SPREAD_EDGE_THRESHOLD = 1.5
+TOTAL_EDGE_THRESHOLD = 3.0
+SCHEDULE_COLUMNS = ["比赛ID", "北京时间", "北京日期", "主队", "客队", "比赛", "实际分差", "实际总分"]
+
+
+def _schedule_rows(us_date: str, game_header: pd.DataFrame, lines: pd.DataFrame) -> pd.DataFrame:
+    """将单个美国日期的赛程表头与各队比分拼为比赛行，比分按 (GAME_ID, TEAM_ABBREVIATION) 一次性索引。"""
+    if game_header.empty or lines.empty:
+        return pd.DataFrame(columns=SCHEDULE_COLUMNS)
+
+    day_str = datetime.strptime(us_date, "%m/%d/%Y").strftime("%Y-%m-%d")
+    status = game_header.get("GAME_STATUS_TEXT", pd.Series("", index=game_header.index)).astype(str).str.strip()
+    us_time = (day_str + " " + status + ":00").where(status.str.contains(":", regex=False), day_str + " 19:00:00")
+    bj_info = convert_us_series_to_utc_and_beijing(us_time)
+
+    lines = lines.drop_duplicates(subset=["GAME_ID", "TEAM_ABBREVIATION"])
+    line_index = pd.MultiIndex.from_frame(lines[["GAME_ID", "TEAM_ABBREVIATION"]])
+    points = pd.to_numeric(lines["PTS"], errors="coerce").to_numpy() if "PTS" in lines else np.zeros(len(lines))
+    home_pos, away_pos = (
+        line_index.get_indexer(pd.MultiIndex.from_arrays([game_header["GAME_ID"], game_header[team_col]]))
+        for team_col in ("HOME_TEAM_ABBREVIATION", "VISITOR_TEAM_ABBREVIATION")
+    )
+    found = (home_pos >= 0) & (away_pos >= 0)
+    home_pts, away_pts = points[home_pos[found]], points[away_pos[found]]
+
+    games = game_header[found]
+    return pd.DataFrame(
+        {
+            "比赛ID": games["GAME_ID"].to_numpy(),
+            "北京时间": bj_info["bj_time_str"][found].to_numpy(),
+            "北京日期": bj_info["bj_date"][found].to_numpy(),
+            "主队": games["HOME_TEAM_ABBREVIATION"].to_numpy(),
+            "客队": games["VISITOR_TEAM_ABBREVIATION"].to_numpy(),
+            "比赛": (games["VISITOR_TEAM_ABBREVIATION"] + " vs " + games["HOME_TEAM_ABBREVIATION"]).to_numpy(),
+            "实际分差": home_pts - away_pts,
+            "实际总分": home_pts + away_pts,
+        }
+    )
 
 
 def _fetch_schedule_candidates() -> pd.DataFrame:
-    """抓取候选比赛赛程（覆盖北京时间今日可能对应的美国日期）。"""
+    """并发抓取候选比赛赛程（覆盖北京时间今日可能对应的美国日期）。"""
     bj_now = datetime.now(BEIJING_ZONE)
-    us_dates = {
-        (bj_now - timedelta(days=1)).strftime("%m/%d/%Y"),
-        bj_now.strftime("%m/%d/%Y"),
-    }
-
-    all_rows = []
-    for us_date in us_dates:
-        board = scoreboardv2.ScoreboardV2(game_date=us_date)
-        game_header = board.game_header.get_data_frame()
-        if game_header.empty:
-            continue
-        lines = board.line_score.get_data_frame()
-
-        for _, g in game_header.iterrows():
-            game_id = g["GAME_ID"]
-            game_time_et = str(g.get("GAME_STATUS_TEXT", "")).strip()
-            if ":" in game_time_et:
-                us_time_str = datetime.strptime(us_date, "%m/%d/%Y").strftime("%Y-%m-%d") + f" {game_time_et}:00"
-            else:
-                us_time_str = datetime.strptime(us_date, "%m/%d/%Y").strftime("%Y-%m-%d") + " 19:00:00"
-
-            bj_info = convert_to_beijing_time(us_time_str)
-
-            game_lines = lines[lines["GAME_ID"] == game_id]
-            if game_lines.empty:
-                continue
-            home_row = game_lines[game_lines["TEAM_ABBREVIATION"] == g["HOME_TEAM_ABBREVIATION"]]
-            away_row = game_lines[game_lines["TEAM_ABBREVIATION"] == g["VISITOR_TEAM_ABBREVIATION"]]
-            if home_row.empty or away_row.empty:
-                continue
-
-            all_rows.append(
-                {
-                    "比赛ID": game_id,
-                    "北京时间": bj_info["bj_time_str"],
-                    "北京日期": bj_info["bj_date"],
-                    "主队": g["HOME_TEAM_ABBREVIATION"],
-                    "客队": g["VISITOR_TEAM_ABBREVIATION"],
-                    "比赛": f"{g['VISITOR_TEAM_ABBREVIATION']} vs {g['HOME_TEAM_ABBREVIATION']}",
-                    "实际分差": float(home_row.iloc[0].get("PTS", 0)) - float(away_row.iloc[0].get("PTS", 0)),
-                    "实际总分": float(home_row.iloc[0].get("PTS", 0)) + float(away_row.iloc[0].get("PTS", 0)),
-                }
-            )
-
-    return pd.DataFrame(all_rows)
+    us_dates = sorted(
+        {
+            (bj_now - timedelta(days=1)).strftime("%m/%d/%Y"),
+            bj_now.strftime("%m/%d/%Y"),
+        }
+    )
+
+    with ThreadPoolExecutor(max_workers=len(us_dates)) as pool:
+        boards = list(pool.map(fetch_scoreboard, us_dates))
+
+    frames = [_schedule_rows(us_date, header, lines) for us_date, (header, lines) in zip(us_dates, boards)]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=SCHEDULE_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
 
 
 def _load_market_lines() -> pd.DataFrame:
@@ -133,9 +143,9 @@ def predict_today(features_df: pd.DataFrame) -> pd.DataFrame:
     feat_cols = feature_columns()
     merged[feat_cols] = merged[feat_cols].fillna(model_df[feat_cols].median())
 
-    spread_model, total_model = load_models()
-    merged["模型预测让分"] = spread_model.predict(merged[feat_cols]).round(2)
-    merged["模型预测总分"] = total_model.predict(merged[feat_cols]).round(2)
+    spread_pred, total_pred = get_server().predict(merged)
+    merged["模型预测让分"] = spread_pred.round(2)
+    merged["模型预测总分"] = total_pred.round(2)
 
     market_df = _load_market_lines()
     merged = merged.merge(market_df, on="比赛", how="left")
@@ -145,7 +155,7 @@ def predict_today(features_df: pd.DataFrame) -> pd.DataFrame:
     merged["让分优势"] = (merged["模型预测让分"] - merged["市场让分"]).round(2)
     merged["大小分优势"] = (merged["模型预测总分"] - merged["市场总分"]).round(2)
     merged["是否建议下注"] = (
-        (merged["让分优势"].abs() >= 1.5) | (merged["大小分优势"].abs() >= 3.0)
+        (merged["让分优势"].abs() >= SPREAD_EDGE_THRESHOLD) | (merged["大小分优势"].abs() >= TOTAL_EDGE_THRESHOLD)
     ).map({True: "是", False: "否"})
 
     out_cols = [
@@ -0,0 +1,137 @@
+"""HTTP响应磁盘缓存模块：balldontlie 与 nba_api 两个数据源共用。"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+CACHE_MODES = ("normal", "off", "record", "replay")
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[2] / ".cache" / "http"
+
+Ttl = float | None
+TtlPolicy = Ttl | Callable[[Any], Ttl]
+
+
+class CacheMiss(KeyError):
+    """回放模式下缓存中没有对应响应。"""
+
+
+@dataclass
+class FetchedResponse:
+    """一次网络请求的结果；``not_modified`` 表示服务端返回了 304。"""
+
+    payload: Any = None
+    etag: str | None = None
+    last_modified: str | None = None
+    not_modified: bool = False
+
+
+class ResponseCache:
+    """按 (接口, 参数) 缓存 JSON 响应。
+
+    模式（环境变量 ``NBA_HTTP_CACHE_MODE``）:
+    - ``normal``: 未过期直接命中；过期且有 ETag/Last-Modified 时发条件请求，304 则续期
+    - ``off``: 不读不写缓存
+    - ``record``: 总是请求网络并写入缓存，用于录制离线夹具
+    - ``replay``: 只读缓存、从不联网，未命中抛出 ``CacheMiss``
+
+    ``ttl`` 为秒数，``None`` 表示永不过期（例如已完赛的比赛日）。
+    """
+
+    def __init__(self, cache_dir: str | Path | None = None, mode: str | None = None) -> None:
+        self.cache_dir = Path(cache_dir or os.getenv("NBA_HTTP_CACHE_DIR") or DEFAULT_CACHE_DIR)
+        self.mode = (mode or os.getenv("NBA_HTTP_CACHE_MODE") or "normal").strip().lower()
+        if self.mode not in CACHE_MODES:
+            raise ValueError(f"未知缓存模式: {self.mode}，可选 {CACHE_MODES}")
+
+    def _path(self, endpoint: str, params: dict[str, Any]) -> Path:
+        raw = json.dumps({"endpoint": endpoint, "params": params}, sort_keys=True, default=str)
+        digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+        slug = "".join(c if c.isalnum() else "_" for c in endpoint.split("://")[-1]).strip("_")[-80:]
+        return self.cache_dir / slug / f"{digest}.json"
+
+    def get(self, endpoint: str, params: dict[str, Any]) -> dict[str, Any] | None:
+        """读取缓存条目（不论是否过期）。"""
+        path = self._path(endpoint, params)
+        if not path.exists():
+            return None
+        with path.open(encoding="utf-8") as fh:
+            return json.load(fh)
+
+    def put(
+        self,
+        endpoint: str,
+        params: dict[str, Any],
+        payload: Any,
+        ttl: Ttl,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> dict[str, Any]:
+        now = time.time()
+        entry = {
+            "endpoint": endpoint,
+            "params": params,
+            "stored_at": now,
+            "expires_at": None if ttl is None else now + ttl,
+            "etag": etag,
+            "last_modified": last_modified,
+            "payload": payload,
+        }
+        path = self._path(endpoint, params)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp.open("w", encoding="utf-8") as fh:
+            json.dump(entry, fh, ensure_ascii=False, default=str)
+        os.replace(tmp, path)
+        return entry
+
+    @staticmethod
+    def is_fresh(entry: dict[str, Any]) -> bool:
+        return entry["expires_at"] is None or entry["expires_at"] > time.time()
+
+    def fetch(
+        self,
+        endpoint: str,
+        params: dict[str, Any],
+        loader: Callable[[dict[str, str]], FetchedResponse],
+        ttl: TtlPolicy,
+    ) -> Any:
+        """按缓存模式返回响应体。
+
+        ``loader`` 接收条件请求头并执行真实请求；``ttl`` 可为秒数/None，
+        或根据响应体决定过期时间的函数。
+        """
+        if self.mode == "off":
+            return loader({}).payload
+
+        entry = self.get(endpoint, params)
+        if self.mode == "replay":
+            if entry is None:
+                raise CacheMiss(f"回放模式缓存未命中: {endpoint} {params}")
+            return entry["payload"]
+
+        headers: dict[str, str] = {}
+        if self.mode == "normal" and entry is not None:
+            if self.is_fresh(entry):
+                return entry["payload"]
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = loader(headers)
+        if response.not_modified and entry is not None:
+            payload = entry["payload"]
+            etag, last_modified = entry.get("etag"), entry.get("last_modified")
+        else:
+            payload = response.payload
+            etag, last_modified = response.etag, response.last_modified
+
+        resolved_ttl = ttl(payload) if callable(ttl) else ttl
+        self.put(endpoint, params, payload, resolved_ttl, etag, last_modified)
+        return payload
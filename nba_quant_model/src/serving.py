@@ -0,0 +1,170 @@
+"""模型服务模块：常驻内存的让分/总分模型批量打分，以及本地HTTP服务与客户端。"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib import request as urllib_request
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.feature_engineering import feature_columns
+from src.modeling import MODEL_META_FILE, SPREAD_MODEL_FILE, TOTAL_MODEL_FILE, file_digest
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.getenv("NBA_MODEL_SERVER_PORT", "8765"))
+DEFAULT_URL = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}"
+
+
+class ModelVersionError(RuntimeError):
+    """模型文件与训练元数据不一致。"""
+
+
+class ModelServer:
+    """一次性加载两个 booster 并常驻内存，按 float32 连续数组做 inplace 预测。"""
+
+    def __init__(
+        self,
+        spread_file: Path = SPREAD_MODEL_FILE,
+        total_file: Path = TOTAL_MODEL_FILE,
+        meta_file: Path = MODEL_META_FILE,
+    ) -> None:
+        self.spread_file = Path(spread_file)
+        self.total_file = Path(total_file)
+        self.meta_file = Path(meta_file)
+        self._lock = threading.Lock()
+        self.load()
+
+    def _stamp(self) -> tuple:
+        return tuple(p.stat().st_mtime_ns if p.exists() else 0 for p in (self.spread_file, self.total_file, self.meta_file))
+
+    def load(self) -> None:
+        """加载模型并与 model_meta.json 校验文件摘要和特征列。"""
+        if not self.meta_file.exists():
+            raise ModelVersionError(f"缺少 {self.meta_file}，请先运行 train.py")
+        with open(self.meta_file, encoding="utf-8") as fh:
+            meta = json.load(fh)
+
+        if file_digest(self.spread_file) != meta.get("spread_sha256") or file_digest(self.total_file) != meta.get(
+            "total_sha256"
+        ):
+            raise ModelVersionError("模型文件与 model_meta.json 记录的版本不一致，请重新训练")
+        if meta.get("feature_columns") != feature_columns():
+            raise ModelVersionError("模型训练时的特征列与当前代码不一致，请重新训练")
+
+        spread = joblib.load(self.spread_file).get_booster()
+        total = joblib.load(self.total_file).get_booster()
+        with self._lock:
+            self.meta = meta
+            self.version = meta["model_version"]
+            self.columns = list(meta["feature_columns"])
+            self._spread, self._total = spread, total
+            self._loaded_stamp = self._stamp()
+
+    def reload_if_changed(self) -> bool:
+        """模型或元数据文件更新后重新加载。"""
+        if self._stamp() == self._loaded_stamp:
+            return False
+        self.load()
+        return True
+
+    def predict_array(self, x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """对 (场次, 特征) 矩阵打分，返回 (让分预测, 总分预测)。"""
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        with self._lock:
+            spread, total = self._spread, self._total
+        return spread.inplace_predict(x), total.inplace_predict(x)
+
+    def predict(self, features_df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        """按训练时的特征列顺序取列后打分。"""
+        return self.predict_array(features_df[self.columns].to_numpy(dtype=np.float32))
+
+
+_SERVER: ModelServer | None = None
+_SERVER_LOCK = threading.Lock()
+
+
+def get_server() -> ModelServer:
+    """进程内共享的模型服务实例，模型文件更新后自动重新加载。"""
+    global _SERVER
+    with _SERVER_LOCK:
+        if _SERVER is None:
+            _SERVER = ModelServer()
+        else:
+            _SERVER.reload_if_changed()
+        return _SERVER
+
+
+class _PredictionHandler(BaseHTTPRequestHandler):
+    """``GET /health`` 返回模型版本；``POST /predict`` 接收 ``{"records": [{特征: 值}]}`` 或 ``{"rows": [[...]]}``。"""
+
+    server_version = "NBAModelServer/1.0"
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            self._send_json(404, {"error": "not found"})
+            return
+        server = get_server()
+        self._send_json(200, {"model_version": server.version, "feature_columns": server.columns})
+
+    def do_POST(self) -> None:
+        if self.path != "/predict":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            server = get_server()
+            if "records" in payload:
+                x = pd.DataFrame(payload["records"], columns=server.columns).to_numpy(dtype=np.float32)
+            else:
+                x = np.asarray(payload.get("rows", []), dtype=np.float32).reshape(-1, len(server.columns))
+            spread, total = server.predict_array(x)
+        except (ValueError, KeyError, TypeError) as exc:
+            self._send_json(400, {"error": str(exc)})
+            return
+        except ModelVersionError as exc:
+            self._send_json(503, {"error": str(exc)})
+            return
+        self._send_json(
+            200, {"model_version": server.version, "spread": spread.tolist(), "total": total.tolist()}
+        )
+
+    def log_message(self, format: str, *args) -> None:
+        """静默逐请求日志。"""
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+    """启动常驻本地HTTP模型服务（阻塞运行）。"""
+    server = get_server()
+    httpd = ThreadingHTTPServer((host, port), _PredictionHandler)
+    print(f"模型服务已启动: http://{host}:{port}，模型版本 {server.version}")
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
+
+
+def request_predictions(features_df: pd.DataFrame, url: str = DEFAULT_URL, timeout: float = 5.0) -> dict:
+    """向本地模型服务请求一整张赛程的预测，返回 {model_version, spread, total}。"""
+    records = features_df[feature_columns()].astype(float).replace({np.nan: None}).to_dict(orient="records")
+    body = json.dumps({"records": records}, ensure_ascii=False).encode("utf-8")
+    req = urllib_request.Request(
+        f"{url}/predict", data=body, headers={"Content-Type": "application/json"}, method="POST"
+    )
+    with urllib_request.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read())
@@ -0,0 +1,66 @@
+"""nba_api 访问模块：统一经过响应缓存，并将缓存的原始JSON还原为DataFrame。"""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Any
+
+import pandas as pd
+from nba_api.stats.endpoints import leaguegamelog, scoreboardv2
+
+from src.response_cache import FetchedResponse, ResponseCache
+
+
+OPEN_SEASON_TTL = 6 * 3600
+LIVE_SCOREBOARD_TTL = 300
+FINAL_STATUS_ID = 3
+
+CACHE = ResponseCache()
+
+
+def result_set_frame(payload: dict[str, Any], name: str) -> pd.DataFrame:
+    """从 nba_api 原始响应中按名称取出结果集。"""
+    result_sets = payload.get("resultSets") or payload.get("resultSet") or []
+    if isinstance(result_sets, dict):
+        result_sets = [result_sets]
+    for result_set in result_sets:
+        if result_set.get("name") == name:
+            return pd.DataFrame(result_set.get("rowSet", []), columns=result_set.get("headers", []))
+    return pd.DataFrame()
+
+
+def _season_finished(season: str) -> bool:
+    """赛季（如 2024-25）在次年7月1日后视为完结，数据不再变化。"""
+    end_year = int(season[:4]) + 1
+    return date.today() >= date(end_year, 7, 1)
+
+
+def fetch_league_game_log(season: str, season_type: str) -> pd.DataFrame:
+    """获取球队粒度比赛日志；已完结赛季永久缓存，进行中赛季按小时级过期。"""
+    params = {"season": season, "season_type_all_star": season_type, "player_or_team_abbreviation": "T"}
+
+    def load(_: dict[str, str]) -> FetchedResponse:
+        return FetchedResponse(payload=leaguegamelog.LeagueGameLog(**params).get_dict())
+
+    ttl = None if _season_finished(season) else OPEN_SEASON_TTL
+    payload = CACHE.fetch("stats/leaguegamelog", params, load, ttl)
+    return result_set_frame(payload, "LeagueGameLog")
+
+
+def _scoreboard_ttl(payload: dict[str, Any]) -> float | None:
+    """当日全部比赛已完赛则永久缓存，否则短期过期以跟进赛程与比分。"""
+    header = result_set_frame(payload, "GameHeader")
+    if not header.empty and (header["GAME_STATUS_ID"] == FINAL_STATUS_ID).all():
+        return None
+    return LIVE_SCOREBOARD_TTL
+
+
+def fetch_scoreboard(us_date: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """获取美国日期（MM/DD/YYYY）的赛程表头与各队比分。"""
+    params = {"game_date": datetime.strptime(us_date, "%m/%d/%Y").strftime("%m/%d/%Y")}
+
+    def load(_: dict[str, str]) -> FetchedResponse:
+        return FetchedResponse(payload=scoreboardv2.ScoreboardV2(**params).get_dict())
+
+    payload = CACHE.fetch("stats/scoreboardv2", params, load, _scoreboard_ttl)
+    return result_set_frame(payload, "GameHeader"), result_set_frame(payload, "LineScore")
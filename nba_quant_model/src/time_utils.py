@@ -5,6 +5,9 @@ from __future__ import annotations
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
+import numpy as np
+import pandas as pd
+
 US_EASTERN = ZoneInfo("America/New_York")
 UTC_ZONE = ZoneInfo("UTC")
 BEIJING_ZONE = ZoneInfo("Asia/Shanghai")
@@ -56,15 +59,61 @@ def convert_us_to_utc_and_beijing(us_time_str: str) -> dict:
     """将美国东部时间同时转换为UTC与北京时间。"""
     us_dt = _parse_us_time(us_time_str)
     utc_dt = us_dt.astimezone(UTC_ZONE)
-    bj_info = convert_to_beijing_time(us_time_str)
+    bj_dt = us_dt.astimezone(BEIJING_ZONE)
     return {
         "utc_time": utc_dt.strftime("%Y-%m-%d %H:%M:%S"),
-        "bj_datetime": bj_info["bj_datetime"],
-        "bj_date": bj_info["bj_date"],
-        "bj_time_str": bj_info["bj_time_str"],
+        "bj_datetime": bj_dt,
+        "bj_date": bj_dt.strftime("%Y-%m-%d"),
+        "bj_time_str": bj_dt.strftime("%Y-%m-%d %H:%M:%S"),
     }
 
 
+def _format_series(times: pd.Series, fmt: str) -> pd.Series:
+    """按唯一时刻格式化后回填（比赛时间大量重复，只格式化去重后的值）。"""
+    codes, uniques = pd.factorize(times)
+    labels = pd.DatetimeIndex(uniques).strftime(fmt).to_numpy(dtype=object)
+    values = np.full(len(codes), None, dtype=object)
+    values[codes >= 0] = labels[codes[codes >= 0]]
+    return pd.Series(values, index=times.index, dtype=object)
+
+
+def localize_us_eastern(us_times: pd.Series) -> pd.Series:
+    """将整列美国东部时间字符串一次性解析并本地化为带时区的时间列。
+
+    解析按 ISO 8601 统一推断格式（兼容 ``_parse_us_time`` 的四种写法）；夏令时切换处的重复时刻取夏令时、
+    不存在的时刻后移一小时，与逐行 ``datetime.replace(tzinfo=US_EASTERN)`` 的结果一致。
+    时区按名称传给 pandas，避免逐元素调用 ZoneInfo。
+    """
+    cleaned = us_times.astype(str).str.strip().str.replace("Z", "", regex=False)
+    try:
+        parsed = pd.to_datetime(cleaned, format="ISO8601")
+    except ValueError as exc:
+        raise ValueError(f"无法解析美国东部时间列: {exc}") from exc
+    return parsed.dt.tz_localize(US_EASTERN.key, ambiguous=True, nonexistent=pd.Timedelta(hours=1))
+
+
+def convert_us_series_to_utc_and_beijing(us_times: pd.Series) -> pd.DataFrame:
+    """整列版 ``convert_us_to_utc_and_beijing``，返回与输入同索引的 utc_time / bj_datetime / bj_date / bj_time_str 列。"""
+    us_dt = localize_us_eastern(us_times)
+    bj_dt = us_dt.dt.tz_convert(BEIJING_ZONE.key)
+    bj_local = bj_dt.dt.tz_localize(None)
+    return pd.DataFrame(
+        {
+            "utc_time": _format_series(us_dt.dt.tz_convert(UTC_ZONE.key).dt.tz_localize(None), "%Y-%m-%d %H:%M:%S"),
+            "bj_datetime": bj_dt,
+            "bj_date": _format_series(bj_local.dt.normalize(), "%Y-%m-%d"),
+            "bj_time_str": _format_series(bj_local, "%Y-%m-%d %H:%M:%S"),
+        },
+        index=us_times.index,
+    )
+
+
+def convert_utc_series_to_beijing(utc_times: pd.Series, fmt: str = "%Y-%m-%d %H:%M:%S") -> pd.Series:
+    """将整列UTC时间（ISO 8601，可带 Z 或时区偏移）转换为北京时间字符串。"""
+    utc_dt = pd.to_datetime(utc_times, format="ISO8601", utc=True)
+    return _format_series(utc_dt.dt.tz_convert(BEIJING_ZONE.key).dt.tz_localize(None), fmt)
+
+
 def now_beijing_date_str() -> str:
     """获取当前北京时间日期字符串。"""
     return datetime.now(BEIJING_ZONE).strftime("%Y-%m-%d")
@@ -0,0 +1,188 @@
+"""滚动回测模块：按北京日期逐日重放历史，只用截止当日之前的比赛训练并预测当日比赛。"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.feature_engineering import feature_columns
+from src.modeling import BASE_ROUNDS, INCREMENTAL_ROUNDS, MAX_TREES, fit_model_pair
+from src.predictor import SPREAD_EDGE_THRESHOLD, TOTAL_EDGE_THRESHOLD
+
+
+WALK_FORWARD_FILE = Path("data") / "walk_forward_history.csv"
+# 每个折从零训练一次，之后逐日增量提升，折长保证累计树数不超过 MAX_TREES，与 train.py 的 auto 模式一致
+DEFAULT_FOLD_DAYS = (MAX_TREES - BASE_ROUNDS) // INCREMENTAL_ROUNDS
+MIN_TRAIN_GAMES = 300
+SEASON_GAP_DAYS = 60
+ELO_POINTS_PER_POINT = 28.0
+
+# 工作进程内只读共享的特征矩阵、标签与每日行区间，由 _init_worker 每个进程接收一次
+_SHARED: dict[str, np.ndarray] = {}
+
+
+def _init_worker(x: np.ndarray, y_spread: np.ndarray, y_total: np.ndarray, day_bounds: np.ndarray) -> None:
+    """工作进程初始化：保存共享数组并设为只读。"""
+    for name, arr in (("x", x), ("y_spread", y_spread), ("y_total", y_total), ("day_bounds", day_bounds)):
+        arr.setflags(write=False)
+        _SHARED[name] = arr
+
+
+def _run_fold(first_day: int, last_day: int, n_jobs: int, daily_update: bool) -> tuple[int, np.ndarray, np.ndarray]:
+    """训练截至 first_day 前的全部比赛，逐日预测 [first_day, last_day]，每日赛后在当日比赛上继续提升。"""
+    x, y_spread, y_total, bounds = _SHARED["x"], _SHARED["y_spread"], _SHARED["y_total"], _SHARED["day_bounds"]
+    start = bounds[first_day]
+    models = fit_model_pair(x[:start], y_spread[:start], y_total[:start], BASE_ROUNDS, n_jobs=n_jobs)
+
+    if not daily_update:
+        x_fold = x[start : bounds[last_day + 1]]
+        return start, models[0].get_booster().inplace_predict(x_fold), models[1].get_booster().inplace_predict(x_fold)
+
+    spread_parts, total_parts = [], []
+    for day in range(first_day, last_day + 1):
+        lo, hi = bounds[day], bounds[day + 1]
+        spread_parts.append(models[0].get_booster().inplace_predict(x[lo:hi]))
+        total_parts.append(models[1].get_booster().inplace_predict(x[lo:hi]))
+        if day < last_day:
+            models = fit_model_pair(x[lo:hi], y_spread[lo:hi], y_total[lo:hi], INCREMENTAL_ROUNDS, models, n_jobs)
+    return start, np.concatenate(spread_parts), np.concatenate(total_parts)
+
+
+def _default_start(df: pd.DataFrame) -> str:
+    """默认从最近一个赛季（以休赛期空档划分）的首个比赛日开始；此前比赛不足时从首个此前已有 MIN_TRAIN_GAMES 场比赛的比赛日开始。"""
+    dates = pd.to_datetime(pd.Series(df["北京日期"].unique()))
+    season_starts = dates[dates.diff().dt.days >= SEASON_GAP_DAYS]
+    if not season_starts.empty:
+        latest_start = season_starts.iloc[-1].strftime("%Y-%m-%d")
+        if (df["北京日期"] < latest_start).sum() >= MIN_TRAIN_GAMES:
+            return latest_start
+    dates, counts = np.unique(df["北京日期"].to_numpy(dtype=str), return_counts=True)
+    prior_games = np.cumsum(counts) - counts
+    first = int(np.searchsorted(prior_games, MIN_TRAIN_GAMES))
+    if first == len(dates):
+        raise ValueError(f"已完赛比赛不足以在任一比赛日之前积累 {MIN_TRAIN_GAMES} 场训练样本")
+    return str(dates[first])
+
+
+def _baseline_lines(df: pd.DataFrame, day: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """无市场盘口时的基线盘口：此前各比赛日的场均分差加ELO差折算分差、场均总分，按0.5取整。"""
+    n_days = int(day[-1]) + 1
+    counts = np.bincount(day, minlength=n_days)
+    prior_games = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    prior_games = np.maximum(prior_games, 1)
+    prior_margin = np.concatenate([[0.0], np.cumsum(np.bincount(day, df["实际分差"], n_days))[:-1]]) / prior_games
+    prior_total = np.concatenate([[0.0], np.cumsum(np.bincount(day, df["实际总分"], n_days))[:-1]]) / prior_games
+
+    spread = prior_margin[day] + df["动态ELO差"].to_numpy() / ELO_POINTS_PER_POINT
+    total = prior_total[day]
+    return np.round(spread * 2) / 2, np.round(total * 2) / 2
+
+
+def _attach_market_lines(out: pd.DataFrame, market_lines: pd.DataFrame | None) -> pd.DataFrame:
+    """合并历史盘口（按比赛ID，或按北京日期+比赛），缺失的比赛使用基线盘口。"""
+    out["盘口来源"] = "基线"
+    if market_lines is None or market_lines.empty:
+        return out
+
+    keys = ["比赛ID"] if "比赛ID" in market_lines.columns else ["北京日期", "比赛"]
+    lines = market_lines[keys + ["市场让分", "市场总分"]].copy()
+    if keys == ["比赛ID"]:
+        lines["比赛ID"] = lines["比赛ID"].astype(str)
+    lines = lines.drop_duplicates(subset=keys, keep="last")
+
+    out = out.merge(lines, on=keys, how="left", suffixes=("", "_市场"))
+    has_market = out["市场让分_市场"].notna() & out["市场总分_市场"].notna()
+    out.loc[has_market, "市场让分"] = out.loc[has_market, "市场让分_市场"]
+    out.loc[has_market, "市场总分"] = out.loc[has_market, "市场总分_市场"]
+    out.loc[has_market, "盘口来源"] = "市场"
+    return out.drop(columns=["市场让分_市场", "市场总分_市场"])
+
+
+def walk_forward(
+    features_df: pd.DataFrame,
+    start: str | None = None,
+    end: str | None = None,
+    fold_days: int = DEFAULT_FOLD_DAYS,
+    workers: int | None = None,
+    daily_update: bool = True,
+    market_lines: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """对 [start, end] 内的北京日期做滚动回测，返回与预测历史同结构的逐场预测与赛果。
+
+    回测区间按 ``fold_days`` 个比赛日切分为若干折，各折在进程池中并行：先用折首日之前的全部比赛
+    从零训练，再逐日预测并在当日比赛上继续提升 ``INCREMENTAL_ROUNDS`` 棵树。
+    """
+    df = features_df.dropna(subset=["实际分差", "实际总分"]).copy()
+    df["比赛ID"] = df["比赛ID"].astype(str)
+    df = df.sort_values(["北京日期", "比赛ID"]).reset_index(drop=True)
+
+    start = start or _default_start(df)
+    end = end or df["北京日期"].max()
+    day = pd.factorize(df["北京日期"], sort=True)[0]
+    test_days = np.unique(day[(df["北京日期"] >= start).to_numpy() & (df["北京日期"] <= end).to_numpy()])
+    if test_days.size == 0:
+        raise ValueError(f"{start} 至 {end} 之间没有已完赛的比赛")
+    if (day < test_days[0]).sum() < MIN_TRAIN_GAMES:
+        raise ValueError(f"回测起点 {start} 之前的比赛少于 {MIN_TRAIN_GAMES} 场，无法训练")
+
+    folds = [(int(chunk[0]), int(chunk[-1])) for chunk in np.array_split(test_days, -(-test_days.size // fold_days))]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(folds)))
+    n_jobs = max(1, (os.cpu_count() or 1) // workers)
+
+    x = np.ascontiguousarray(df[feature_columns()].to_numpy(dtype=np.float32))
+    y_spread = df["实际分差"].to_numpy(dtype=np.float64)
+    y_total = df["实际总分"].to_numpy(dtype=np.float64)
+    day_bounds = np.searchsorted(day, np.arange(day[-1] + 2))
+
+    # xgboost 使用 OpenMP，fork 已初始化线程池的进程可能死锁，统一用 spawn 启动工作进程
+    spread_pred = np.full(len(df), np.nan)
+    total_pred = np.full(len(df), np.nan)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(x, y_spread, y_total, day_bounds),
+    ) as pool:
+        futures = [pool.submit(_run_fold, first, last, n_jobs, daily_update) for first, last in folds]
+        for future in futures:
+            lo, spread, total = future.result()
+            spread_pred[lo : lo + len(spread)] = spread
+            total_pred[lo : lo + len(total)] = total
+
+    market_spread, market_total = _baseline_lines(df, day)
+    out = df[["比赛ID", "北京时间", "北京日期", "比赛", "实际分差", "实际总分"]].copy()
+    out["模型预测让分"] = spread_pred.round(2)
+    out["模型预测总分"] = total_pred.round(2)
+    out["市场让分"] = market_spread
+    out["市场总分"] = market_total
+    out = out[~np.isnan(spread_pred)]
+    out = _attach_market_lines(out, market_lines)
+
+    out["让分优势"] = (out["模型预测让分"] - out["市场让分"]).round(2)
+    out["大小分优势"] = (out["模型预测总分"] - out["市场总分"]).round(2)
+    out["是否建议下注"] = np.where(
+        (out["让分优势"].abs() >= SPREAD_EDGE_THRESHOLD) | (out["大小分优势"].abs() >= TOTAL_EDGE_THRESHOLD), "是", "否"
+    )
+    return out[
+        [
+            "比赛ID",
+            "北京时间",
+            "北京日期",
+            "比赛",
+            "模型预测让分",
+            "市场让分",
+            "让分优势",
+            "模型预测总分",
+            "市场总分",
+            "大小分优势",
+            "是否建议下注",
+            "盘口来源",
+            "实际分差",
+            "实际总分",
+        ]
+    ].reset_index(drop=True)
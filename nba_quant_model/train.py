@@ -2,24 +2,34 @@
 
 from __future__ import annotations
 
+import argparse
+
 import pandas as pd
 
 from src.data_loader import download_games_history
-from src.feature_engineering import build_match_features
-from src.modeling import train_models
+from src.feature_cache import load_or_build_features
+from src.modeling import TRAIN_MODES, train_models
 
 
 def main() -> None:
     """执行训练流程。"""
+    parser = argparse.ArgumentParser(description="训练让分与总分模型")
+    parser.add_argument(
+        "--mode",
+        choices=TRAIN_MODES,
+        default="auto",
+        help="auto: 样本未变化时跳过、有新完赛比赛时在已有模型上继续提升；full: 从零训练",
+    )
+    args = parser.parse_args()
+
     print("开始下载并整理历史比赛数据...")
     raw_df = download_games_history()
 
     print("开始生成特征...")
-    feature_df = build_match_features(raw_df)
-    feature_df.to_csv("data/features.csv", index=False, encoding="utf-8-sig")
+    feature_df = load_or_build_features(raw_df)
 
     print("开始训练XGBoost模型...")
-    train_models(feature_df)
+    train_models(feature_df, mode=args.mode)
 
     print(f"训练完成，共使用比赛样本: {len(feature_df)} 场")
     print("模型已保存至 models/spread_model.joblib 与 models/total_model.joblib")
@@ -1,10 +1,28 @@
 from __future__ import annotations
 
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from typing import Sequence
 
 import numpy as np
+from scipy.special import ndtr, ndtri
+from scipy.stats import qmc
 
-from model.rating_model import TeamProfile
+from model.rating_model import TeamProfile, TeamTable
+
+BASE_POINTS = 111.5
+HOME_COURT_POINTS = 1.5
+SCORE_STD = 11.5
+
+SAMPLING_MODES = ("pseudo", "antithetic", "crn", "sobol")
+MIN_PSEUDO_RUNS = 10000
+SOBOL_REPLICATES = 8
+LADDER_METHODS = ("simulate", "normal")
+SEEDED_SAMPLING_MODES = ("pseudo", "antithetic")
+DEFAULT_BLOCK_RUNS = 1_000_000
+# 每个分块 (场次, 2, n_runs) 抽样矩阵的元素上限，约 32MB/float64 数组
+CHUNK_ELEMENT_BUDGET = 1 << 22
 
 
 @dataclass
@@ -13,14 +31,246 @@ class SimulationResult:
     away_mean: float
     spread_cover_prob: float
     over_prob: float
+    spread_cover_se: float = 0.0
+    over_se: float = 0.0
+    n_runs: int = 0
+
+
+@dataclass
+class SlateSimulationResult:
+    """整晚（或整段回填窗口）比赛的批量模拟结果，每个字段按比赛顺序对齐。"""
+
+    home_mean: np.ndarray
+    away_mean: np.ndarray
+    spread_cover_prob: np.ndarray
+    over_prob: np.ndarray
+    spread_cover_se: np.ndarray
+    over_se: np.ndarray
+    n_runs: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.home_mean)
+
+    def game(self, i: int) -> SimulationResult:
+        return SimulationResult(
+            home_mean=float(self.home_mean[i]),
+            away_mean=float(self.away_mean[i]),
+            spread_cover_prob=float(self.spread_cover_prob[i]),
+            over_prob=float(self.over_prob[i]),
+            spread_cover_se=float(self.spread_cover_se[i]),
+            over_se=float(self.over_se[i]),
+            n_runs=int(self.n_runs[i]),
+        )
+
+
+class LineDistribution:
+    """单个盘口市场（让分差/总分/单队得分）的结果分布，可查询任意盘口的过线概率与公平线。
+
+    由模拟样本构造时保存排序后的样本，过线概率通过二分查找得到；
+    由正态参数构造时使用闭式正态分布。
+    """
+
+    def __init__(self, sorted_samples: np.ndarray | None = None, mean: float = 0.0, std: float = 0.0) -> None:
+        self.sorted_samples = sorted_samples
+        self.mean = mean
+        self.std = std
+
+    @classmethod
+    def from_samples(cls, samples: np.ndarray) -> LineDistribution:
+        samples = np.sort(np.asarray(samples, dtype=float))
+        return cls(sorted_samples=samples, mean=float(np.mean(samples)), std=float(np.std(samples)))
+
+    @classmethod
+    def normal(cls, mean: float, std: float) -> LineDistribution:
+        return cls(mean=float(mean), std=float(std))
+
+    def prob_over(self, lines: Sequence[float] | np.ndarray) -> np.ndarray:
+        """结果严格大于各盘口的概率。"""
+        lines = np.asarray(lines, dtype=float)
+        if self.sorted_samples is None:
+            return ndtr((self.mean - lines) / self.std)
+        n = len(self.sorted_samples)
+        return 1.0 - np.searchsorted(self.sorted_samples, lines, side="right") / n
+
+    def fair_line(self, prob: float = 0.5) -> float:
+        """过线概率等于 ``prob`` 的盘口，默认即五五开的公平线。"""
+        if self.sorted_samples is None:
+            return float(self.mean + self.std * ndtri(1 - prob))
+        return float(np.quantile(self.sorted_samples, 1 - prob))
+
+
+@dataclass
+class LadderPricing:
+    """单场比赛一整组备选盘口的定价结果。"""
+
+    spread_lines: np.ndarray
+    spread_cover_prob: np.ndarray
+    total_lines: np.ndarray
+    over_prob: np.ndarray
+    home_total_lines: np.ndarray
+    home_over_prob: np.ndarray
+    away_total_lines: np.ndarray
+    away_over_prob: np.ndarray
+    fair_spread: float
+    fair_total: float
+    fair_home_total: float
+    fair_away_total: float
+    margin: LineDistribution
+    total: LineDistribution
+    home: LineDistribution
+    away: LineDistribution
+
+
+class _ChunkAccumulator:
+    """累积一个分块内各场比赛的得分和与命中指标的一、二阶矩，用于均值与标准误。"""
+
+    def __init__(self, n_games: int) -> None:
+        self.home_sum = np.zeros(n_games)
+        self.away_sum = np.zeros(n_games)
+        self.cover_sum = np.zeros(n_games)
+        self.cover_sq = np.zeros(n_games)
+        self.over_sum = np.zeros(n_games)
+        self.over_sq = np.zeros(n_games)
+        self.n_draws = 0
+        self.n_units = 0
+
+    def add(self, home_scores: np.ndarray, away_scores: np.ndarray, cover_units: np.ndarray, over_units: np.ndarray) -> None:
+        self.home_sum += np.sum(home_scores, axis=1)
+        self.away_sum += np.sum(away_scores, axis=1)
+        self.cover_sum += np.sum(cover_units, axis=1)
+        self.cover_sq += np.sum(cover_units * cover_units, axis=1)
+        self.over_sum += np.sum(over_units, axis=1)
+        self.over_sq += np.sum(over_units * over_units, axis=1)
+        self.n_draws += home_scores.shape[1]
+        self.n_units += cover_units.shape[1]
+
+    def _se(self, total: np.ndarray, sq: np.ndarray) -> np.ndarray:
+        m = self.n_units
+        if m < 2:
+            return np.full_like(total, np.inf)
+        mean = total / m
+        var = np.maximum(sq / m - mean * mean, 0.0) * m / (m - 1)
+        return np.sqrt(var / m)
+
+    def cover_se(self) -> np.ndarray:
+        return self._se(self.cover_sum, self.cover_sq)
+
+    def over_se(self) -> np.ndarray:
+        return self._se(self.over_sum, self.over_sq)
+
+
+def game_seed_key(game_id: str) -> int:
+    """由 game_id 生成稳定的 64 位整数，用作该场比赛随机数流的 spawn key。"""
+    digest = hashlib.blake2b(str(game_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _simulate_block(task: tuple) -> np.ndarray:
+    """在独立随机数流上模拟一场比赛的一个分块，返回该块的得分和与命中指标矩。
+
+    定义在模块级以便进程池序列化。
+    """
+    seed, game_key, block, n, home_mu, away_mu, spread_line, total_line, antithetic = task
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(game_key, block)))
+    if antithetic:
+        half = rng.standard_normal(size=(2, n // 2))
+        z = np.concatenate([half, -half], axis=1)
+    else:
+        z = rng.standard_normal(size=(2, n))
+
+    home_scores = home_mu + SCORE_STD * z[0]
+    away_scores = away_mu + SCORE_STD * z[1]
+    cover = (home_scores - away_scores > spread_line).astype(float)
+    over = (home_scores + away_scores > total_line).astype(float)
+    if antithetic:
+        cover = (cover[: n // 2] + cover[n // 2 :]) / 2
+        over = (over[: n // 2] + over[n // 2 :]) / 2
+
+    return np.array(
+        [
+            np.sum(home_scores),
+            np.sum(away_scores),
+            np.sum(cover),
+            np.sum(cover * cover),
+            np.sum(over),
+            np.sum(over * over),
+            len(cover),
+        ]
+    )
 
 
 class NBAMonteCarloSimulator:
-    def __init__(self, n_runs: int = 10000, seed: int = 42) -> None:
-        if n_runs < 10000:
-            raise ValueError("Monte Carlo次数必须 >= 10000")
+    """比赛得分 Monte Carlo 模拟器。
+
+    ``sampling`` 可选:
+    - ``pseudo``: 普通伪随机抽样（默认，要求 n_runs >= 10000）
+    - ``antithetic``: 对偶变量，每个标准正态数与其相反数成对使用
+    - ``crn``: 公共随机数，同一模拟器内所有比赛共用同一组情景
+    - ``sobol``: 加扰 Sobol 序列的准 Monte Carlo，n_runs 须为 2 的幂；每批拆成
+      若干组独立加扰的序列，以组间差异估计标准误
+
+    设置 ``target_se`` 后进入自适应模式：每轮追加 ``n_runs`` 次抽样，直到
+    ``spread_cover_prob`` 与 ``over_prob`` 的标准误都不超过该值或达到 ``max_runs``。
+    """
+
+    def __init__(
+        self,
+        n_runs: int = 10000,
+        seed: int = 42,
+        sampling: str = "pseudo",
+        target_se: float | None = None,
+        max_runs: int | None = None,
+    ) -> None:
+        if sampling not in SAMPLING_MODES:
+            raise ValueError(f"未知抽样方式: {sampling}，可选 {SAMPLING_MODES}")
+        if n_runs <= 0:
+            raise ValueError("Monte Carlo次数必须为正数")
+        if sampling == "pseudo" and target_se is None and n_runs < MIN_PSEUDO_RUNS:
+            raise ValueError(f"Monte Carlo次数必须 >= {MIN_PSEUDO_RUNS}")
+        if sampling == "antithetic" and n_runs % 2:
+            raise ValueError("对偶抽样次数必须为偶数")
+        if sampling == "sobol" and (n_runs & (n_runs - 1) or n_runs < SOBOL_REPLICATES * 2):
+            raise ValueError(f"Sobol抽样次数必须为2的幂且 >= {SOBOL_REPLICATES * 2}")
+        if target_se is not None and target_se <= 0:
+            raise ValueError("target_se 必须为正数")
+
         self.n_runs = n_runs
+        self.seed = seed
+        self.sampling = sampling
+        self.target_se = target_se
+        self.max_runs = max_runs if max_runs is not None else n_runs * 20
         self.rng = np.random.default_rng(seed)
+        self._crn_blocks: list[np.ndarray] = []
+
+    @staticmethod
+    def expected_scores(
+        home_offense: np.ndarray,
+        home_defense: np.ndarray,
+        home_pace: np.ndarray,
+        away_offense: np.ndarray,
+        away_defense: np.ndarray,
+        away_pace: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """由双方强度参数计算主客队期望得分（逐场向量化）。"""
+        home_expect = BASE_POINTS + home_offense + away_defense + HOME_COURT_POINTS
+        away_expect = BASE_POINTS + away_offense + home_defense
+
+        tempo_factor = (home_pace + away_pace) / 200.0
+        return home_expect * tempo_factor, away_expect * tempo_factor
+
+    @classmethod
+    def table_expected_scores(
+        cls, table: TeamTable, home_idx: np.ndarray, away_idx: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """用主客队行号数组对球队评分表做花式索引，计算整张赛程的期望得分。"""
+        return cls.expected_scores(
+            table.offense[home_idx],
+            table.defense[home_idx],
+            table.pace[home_idx],
+            table.offense[away_idx],
+            table.defense[away_idx],
+            table.pace[away_idx],
+        )
 
     def simulate_game(
         self,
@@ -29,26 +279,303 @@ class NBAMonteCarloSimulator:
         spread_line: float,
         total_line: float,
     ) -> SimulationResult:
-        base_points = 111.5
-        home_expect = base_points + home.offense_rating + away.defense_rating + 1.5
-        away_expect = base_points + away.offense_rating + home.defense_rating
+        return self.simulate_slate([home], [away], [spread_line], [total_line]).game(0)
 
-        tempo_factor = (home.pace + away.pace) / 200.0
-        home_mu = home_expect * tempo_factor
-        away_mu = away_expect * tempo_factor
+    def price_ladder(
+        self,
+        home: TeamProfile,
+        away: TeamProfile,
+        spread_lines: Sequence[float] | np.ndarray = (),
+        total_lines: Sequence[float] | np.ndarray = (),
+        home_total_lines: Sequence[float] | np.ndarray = (),
+        away_total_lines: Sequence[float] | np.ndarray = (),
+        method: str = "simulate",
+    ) -> LadderPricing:
+        """一次模拟（或闭式正态）为让分、总分与球队总分的整组盘口定价。
 
-        home_scores = self.rng.normal(loc=home_mu, scale=11.5, size=self.n_runs)
-        away_scores = self.rng.normal(loc=away_mu, scale=11.5, size=self.n_runs)
+        ``method="simulate"`` 按当前抽样方式抽取一批 n_runs 样本并排序保存；
+        ``method="normal"`` 不抽样，直接使用得分正态模型的闭式分布。
+        """
+        if method not in LADDER_METHODS:
+            raise ValueError(f"未知定价方式: {method}，可选 {LADDER_METHODS}")
 
-        margins = home_scores - away_scores
-        totals = home_scores + away_scores
+        home_mu, away_mu = self.expected_scores(
+            np.array([home.offense_rating], dtype=float),
+            np.array([home.defense_rating], dtype=float),
+            np.array([home.pace], dtype=float),
+            np.array([away.offense_rating], dtype=float),
+            np.array([away.defense_rating], dtype=float),
+            np.array([away.pace], dtype=float),
+        )
 
-        cover_prob = float(np.mean(margins > spread_line))
-        over_prob = float(np.mean(totals > total_line))
+        if method == "normal":
+            pair_std = SCORE_STD * np.sqrt(2.0)
+            margin = LineDistribution.normal(home_mu[0] - away_mu[0], pair_std)
+            total = LineDistribution.normal(home_mu[0] + away_mu[0], pair_std)
+            home_dist = LineDistribution.normal(home_mu[0], SCORE_STD)
+            away_dist = LineDistribution.normal(away_mu[0], SCORE_STD)
+        else:
+            z = self._standard_draws(1, 0)
+            home_scores = home_mu[0] + SCORE_STD * z[0, 0, :]
+            away_scores = away_mu[0] + SCORE_STD * z[0, 1, :]
+            margin = LineDistribution.from_samples(home_scores - away_scores)
+            total = LineDistribution.from_samples(home_scores + away_scores)
+            home_dist = LineDistribution.from_samples(home_scores)
+            away_dist = LineDistribution.from_samples(away_scores)
 
-        return SimulationResult(
-            home_mean=float(np.mean(home_scores)),
-            away_mean=float(np.mean(away_scores)),
-            spread_cover_prob=cover_prob,
-            over_prob=over_prob,
+        spread_lines = np.asarray(spread_lines, dtype=float)
+        total_lines = np.asarray(total_lines, dtype=float)
+        home_total_lines = np.asarray(home_total_lines, dtype=float)
+        away_total_lines = np.asarray(away_total_lines, dtype=float)
+        return LadderPricing(
+            spread_lines=spread_lines,
+            spread_cover_prob=margin.prob_over(spread_lines),
+            total_lines=total_lines,
+            over_prob=total.prob_over(total_lines),
+            home_total_lines=home_total_lines,
+            home_over_prob=home_dist.prob_over(home_total_lines),
+            away_total_lines=away_total_lines,
+            away_over_prob=away_dist.prob_over(away_total_lines),
+            fair_spread=margin.fair_line(),
+            fair_total=total.fair_line(),
+            fair_home_total=home_dist.fair_line(),
+            fair_away_total=away_dist.fair_line(),
+            margin=margin,
+            total=total,
+            home=home_dist,
+            away=away_dist,
+        )
+
+    def simulate_slate(
+        self,
+        homes: Sequence[TeamProfile],
+        aways: Sequence[TeamProfile],
+        spread_lines: Sequence[float] | np.ndarray,
+        total_lines: Sequence[float] | np.ndarray,
+        chunk_games: int | None = None,
+    ) -> SlateSimulationResult:
+        """一次性模拟多场比赛。
+
+        与按相同顺序逐场调用 ``simulate_game`` 消耗同一条随机数流，
+        因此相同 seed 下结果逐位一致。
+        """
+        if len(homes) != len(aways):
+            raise ValueError("主客队数量不一致")
+
+        home_mu, away_mu = self.expected_scores(
+            np.array([p.offense_rating for p in homes], dtype=float),
+            np.array([p.defense_rating for p in homes], dtype=float),
+            np.array([p.pace for p in homes], dtype=float),
+            np.array([p.offense_rating for p in aways], dtype=float),
+            np.array([p.defense_rating for p in aways], dtype=float),
+            np.array([p.pace for p in aways], dtype=float),
+        )
+        return self.simulate_expected(home_mu, away_mu, spread_lines, total_lines, chunk_games=chunk_games)
+
+    def simulate_slate_seeded(
+        self,
+        game_ids: Sequence[str],
+        homes: Sequence[TeamProfile],
+        aways: Sequence[TeamProfile],
+        spread_lines: Sequence[float] | np.ndarray,
+        total_lines: Sequence[float] | np.ndarray,
+        workers: int = 1,
+        block_runs: int = DEFAULT_BLOCK_RUNS,
+    ) -> SlateSimulationResult:
+        """按比赛独立随机数流模拟，见 ``simulate_expected_seeded``。"""
+        if len(homes) != len(aways):
+            raise ValueError("主客队数量不一致")
+        home_mu, away_mu = self.expected_scores(
+            np.array([p.offense_rating for p in homes], dtype=float),
+            np.array([p.defense_rating for p in homes], dtype=float),
+            np.array([p.pace for p in homes], dtype=float),
+            np.array([p.offense_rating for p in aways], dtype=float),
+            np.array([p.defense_rating for p in aways], dtype=float),
+            np.array([p.pace for p in aways], dtype=float),
+        )
+        return self.simulate_expected_seeded(
+            game_ids, home_mu, away_mu, spread_lines, total_lines, workers=workers, block_runs=block_runs
+        )
+
+    def simulate_expected_seeded(
+        self,
+        game_ids: Sequence[str],
+        home_mu: np.ndarray,
+        away_mu: np.ndarray,
+        spread_lines: Sequence[float] | np.ndarray,
+        total_lines: Sequence[float] | np.ndarray,
+        workers: int = 1,
+        block_runs: int = DEFAULT_BLOCK_RUNS,
+    ) -> SlateSimulationResult:
+        """按比赛独立随机数流模拟，可在多进程间拆分超大 n_runs。
+
+        每场比赛的每个分块使用 ``SeedSequence(seed, spawn_key=(game_seed_key(game_id), 分块序号))``，
+        分块结果按固定顺序归并，因此输出与进程数、比赛顺序均无关，且逐位一致。
+        不使用模拟器自身的 ``rng``，仅支持 pseudo 与 antithetic 抽样。
+        """
+        if self.sampling not in SEEDED_SAMPLING_MODES:
+            raise ValueError(f"独立流模拟仅支持 {SEEDED_SAMPLING_MODES}")
+        if block_runs <= 0 or (self.sampling == "antithetic" and block_runs % 2):
+            raise ValueError("分块次数必须为正数（对偶抽样时须为偶数）")
+        if not (len(game_ids) == len(home_mu) == len(away_mu) == len(spread_lines) == len(total_lines)):
+            raise ValueError("批量模拟输入长度不一致")
+
+        n_games = len(game_ids)
+        if n_games == 0:
+            empty = np.empty(0)
+            return SlateSimulationResult(
+                home_mean=empty,
+                away_mean=empty.copy(),
+                spread_cover_prob=empty.copy(),
+                over_prob=empty.copy(),
+                spread_cover_se=empty.copy(),
+                over_se=empty.copy(),
+                n_runs=np.empty(0, dtype=np.int64),
+            )
+
+        block_sizes = [min(block_runs, self.n_runs - start) for start in range(0, self.n_runs, block_runs)]
+        antithetic = self.sampling == "antithetic"
+        tasks = [
+            (
+                self.seed,
+                game_seed_key(game_id),
+                block,
+                size,
+                float(home_mu[i]),
+                float(away_mu[i]),
+                float(spread_lines[i]),
+                float(total_lines[i]),
+                antithetic,
+            )
+            for i, game_id in enumerate(game_ids)
+            for block, size in enumerate(block_sizes)
+        ]
+
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                stats = list(pool.map(_simulate_block, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+        else:
+            stats = [_simulate_block(task) for task in tasks]
+
+        totals = np.sum(np.array(stats).reshape(n_games, len(block_sizes), -1), axis=1)
+        acc = _ChunkAccumulator(n_games)
+        acc.home_sum, acc.away_sum = totals[:, 0], totals[:, 1]
+        acc.cover_sum, acc.cover_sq = totals[:, 2], totals[:, 3]
+        acc.over_sum, acc.over_sq = totals[:, 4], totals[:, 5]
+        acc.n_draws = self.n_runs
+        acc.n_units = int(totals[0, 6])
+
+        return SlateSimulationResult(
+            home_mean=acc.home_sum / acc.n_draws,
+            away_mean=acc.away_sum / acc.n_draws,
+            spread_cover_prob=acc.cover_sum / max(acc.n_units, 1),
+            over_prob=acc.over_sum / max(acc.n_units, 1),
+            spread_cover_se=acc.cover_se(),
+            over_se=acc.over_se(),
+            n_runs=np.full(n_games, self.n_runs, dtype=np.int64),
+        )
+
+    def simulate_expected(
+        self,
+        home_mu: np.ndarray,
+        away_mu: np.ndarray,
+        spread_lines: Sequence[float] | np.ndarray,
+        total_lines: Sequence[float] | np.ndarray,
+        chunk_games: int | None = None,
+    ) -> SlateSimulationResult:
+        """按期望得分数组批量模拟；按 ``chunk_games`` 分块以限制 (场次, 次数) 矩阵内存。
+
+        未指定 ``chunk_games`` 时按 ``CHUNK_ELEMENT_BUDGET // (2 * n_runs)`` 取值（至少1场），
+        使单个分块的内存不随 ``n_runs`` 增长。
+        """
+        home_mu = np.asarray(home_mu, dtype=float)
+        away_mu = np.asarray(away_mu, dtype=float)
+        spread_lines = np.asarray(spread_lines, dtype=float)
+        total_lines = np.asarray(total_lines, dtype=float)
+        n_games = len(home_mu)
+        if not (len(away_mu) == len(spread_lines) == len(total_lines) == n_games):
+            raise ValueError("批量模拟输入长度不一致")
+
+        out = {
+            name: np.empty(n_games)
+            for name in ("home_mean", "away_mean", "spread_cover_prob", "over_prob", "spread_cover_se", "over_se")
+        }
+        out_runs = np.empty(n_games, dtype=np.int64)
+
+        if chunk_games is None:
+            chunk_games = CHUNK_ELEMENT_BUDGET // (2 * self.n_runs)
+        chunk_games = max(chunk_games, 1)
+        for start in range(0, n_games, chunk_games):
+            sl = slice(start, min(start + chunk_games, n_games))
+            acc = self._simulate_chunk(home_mu[sl], away_mu[sl], spread_lines[sl], total_lines[sl])
+
+            out["home_mean"][sl] = acc.home_sum / acc.n_draws
+            out["away_mean"][sl] = acc.away_sum / acc.n_draws
+            out["spread_cover_prob"][sl] = acc.cover_sum / acc.n_units
+            out["over_prob"][sl] = acc.over_sum / acc.n_units
+            out["spread_cover_se"][sl] = acc.cover_se()
+            out["over_se"][sl] = acc.over_se()
+            out_runs[sl] = acc.n_draws
+
+        return SlateSimulationResult(n_runs=out_runs, **out)
+
+    def _simulate_chunk(
+        self,
+        home_mu: np.ndarray,
+        away_mu: np.ndarray,
+        spread_lines: np.ndarray,
+        total_lines: np.ndarray,
+    ) -> _ChunkAccumulator:
+        n_games = len(home_mu)
+        acc = _ChunkAccumulator(n_games)
+
+        batch = 0
+        while True:
+            z = self._standard_draws(n_games, batch)
+            home_scores = home_mu[:, None] + SCORE_STD * z[:, 0, :]
+            away_scores = away_mu[:, None] + SCORE_STD * z[:, 1, :]
+
+            margins = home_scores - away_scores
+            totals = home_scores + away_scores
+            cover = (margins > spread_lines[:, None]).astype(float)
+            over = (totals > total_lines[:, None]).astype(float)
+            if self.sampling == "antithetic":
+                # 以对偶对为独立单元估计方差
+                half = self.n_runs // 2
+                cover = (cover[:, :half] + cover[:, half:]) / 2
+                over = (over[:, :half] + over[:, half:]) / 2
+            elif self.sampling == "sobol":
+                # 以每组独立加扰序列的均值为独立单元估计方差
+                cover = cover.reshape(n_games, SOBOL_REPLICATES, -1).mean(axis=2)
+                over = over.reshape(n_games, SOBOL_REPLICATES, -1).mean(axis=2)
+            acc.add(home_scores, away_scores, cover, over)
+
+            batch += 1
+            if self.target_se is None or acc.n_draws + self.n_runs > self.max_runs:
+                return acc
+            if max(acc.cover_se().max(), acc.over_se().max()) <= self.target_se:
+                return acc
+
+    def _standard_draws(self, n_games: int, batch: int) -> np.ndarray:
+        """返回形如 (场次, 2, n_runs) 的标准正态抽样，第二维依次为主队、客队。"""
+        if self.sampling == "pseudo":
+            # 每场依次消耗 n_runs 个主队、n_runs 个客队标准正态数，与逐场调用顺序一致
+            return self.rng.standard_normal(size=(n_games, 2, self.n_runs))
+        if self.sampling == "antithetic":
+            half = self.rng.standard_normal(size=(n_games, 2, self.n_runs // 2))
+            return np.concatenate([half, -half], axis=2)
+        if self.sampling == "crn":
+            while len(self._crn_blocks) <= batch:
+                self._crn_blocks.append(self.rng.standard_normal(size=(2, self.n_runs)))
+            return np.broadcast_to(self._crn_blocks[batch], (n_games, 2, self.n_runs))
+
+        per_replicate = self.n_runs // SOBOL_REPLICATES
+        u = np.concatenate(
+            [
+                qmc.Sobol(d=2 * n_games, scramble=True, seed=self.rng).random(per_replicate)
+                for _ in range(SOBOL_REPLICATES)
+            ]
         )
+        eps = np.finfo(float).eps
+        z = ndtri(np.clip(u, eps, 1 - eps))
+        return z.reshape(self.n_runs, n_games, 2).transpose(1, 2, 0)